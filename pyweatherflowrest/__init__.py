@@ -1,5 +1,12 @@
-"""Python Wrapper for WeatherFlow REST API."""
-from pyweatherflowrest.api import WeatherFlowApiClient
+"""Python Wrapper for WeatherFlow REST API.
+
+Submodules are loaded on first access, so consumers that only need the
+dataclasses or the calculations do not pay for importing aiohttp.
+"""
+from __future__ import annotations
+
+import importlib
+
 from pyweatherflowrest.exceptions import BadRequest, Invalid, NotAuthorized, WrongStationID
 
 __all__ = [
@@ -8,4 +15,45 @@ __all__ = [
     "BadRequest",
     "WrongStationID",
     "WeatherFlowApiClient",
-]
\ No newline at end of file
+]
+
+_LAZY_ATTRIBUTES = {
+    "WeatherFlowApiClient": "pyweatherflowrest.api",
+}
+_LAZY_SUBMODULES = {
+    "api",
+    "astronomy",
+    "bench",
+    "cache",
+    "const",
+    "data",
+    "entities",
+    "events",
+    "fleet",
+    "forecast",
+    "hedging",
+    "helpers",
+    "history",
+    "observation",
+    "polling",
+    "quality",
+    "snapshot",
+    "store",
+}
+
+
+def __getattr__(name: str):
+    """Import the public client and submodules on first access."""
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """Return module attributes including the lazily loaded ones."""
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBMODULES)
@@ -3,13 +3,25 @@ from __future__ import annotations
 
 import aiohttp
 from aiohttp import client_exceptions
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import replace
 import logging
+import time
 from typing import Optional
 
+from pyweatherflowrest import snapshot
+from pyweatherflowrest.astronomy import SolarTable
+from pyweatherflowrest.cache import SharedCache
 from pyweatherflowrest.const import (
-    DEVICE_TYPE_AIR,
+    DEFAULT_DNS_CACHE_TTL,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_LIMIT_PER_HOST,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_STALE_AFTER,
+    DEVICE_API_CODES,
+    DEVICE_TYPE_DESCRIPTIONS,
     DEVICE_TYPE_HUB,
-    DEVICE_TYPE_SKY,
     DEVICE_TYPE_TEMPEST,
     UNIT_TYPE_METRIC,
     VALID_UNIT_TYPES,
@@ -20,51 +32,46 @@ from pyweatherflowrest.const import (
 )
 from pyweatherflowrest.data import (
     DeviceDescription,
+    EventDescription,
     ObservationDescription,
     StationDescription,
     ForecastDescription,
-    ForecastDailyDescription,
-    ForecastHourlyDescription,
-    BeaufortDescription,
 )
-from pyweatherflowrest.exceptions import Invalid, BadRequest, WrongStationID, NotAuthorized
-from pyweatherflowrest.helpers import Conversions, Calculations
+from pyweatherflowrest.entities import EntityPayloads
+from pyweatherflowrest.events import EventDetector
+from pyweatherflowrest.exceptions import Invalid, BadRequest, WrongStationID, NotAuthorized, WeatherFlowError
+from pyweatherflowrest.fleet import FleetState
+from pyweatherflowrest.forecast import ForecastBuilder
+from pyweatherflowrest.hedging import RequestHedging
+from pyweatherflowrest.helpers import FETCH_DRIFT, Conversions, Calculations, resilient_fetch  # noqa: F401
+from pyweatherflowrest.history import ObservationHistory
+from pyweatherflowrest.observation import ObservationBuilder
+from pyweatherflowrest.polling import AdaptivePollInterval
+from pyweatherflowrest.store import ObservationStore
 
 _LOGGER = logging.getLogger(__name__)
 
-# UpDryTwist, 2023-08-29:  This should be set in some better way, but didn't want to do too much reengineering
-#                          of this class and the two places it's called.  This isn't very convenient to patch
-#                          where it is here!
 
+def _endpoint(url: str) -> str:
+    """Return the url without its query string, which holds the token."""
+    return url.split("?")[0]
 
-def resilient_fetch (fetch_from, key, default, ignore_errors=False ):
-    """
-    This can be used to fetch a value out of a suspect return, such as the JSON return from Weatherflow,
-    which as demonstrated on 2023-08-28 may change at some future date.  By default, this is going to
-    error out if the value's not there, but it will log what it's looking for, and you can set a flag
-    to have it ignore the missing value and keep going.
 
-    Provide an array or dictionary to read from in fetch_from, and the key to use.  The default will
-    be returned if we've set IGNORE_FETCH_ERRORS, otherwise, we're going to throw a KeyError.
+def _marked_copy(entity_data, is_stale: bool, data_age: float):
+    """Return a copy of data with staleness markers set.
+
+    A forecast copy holds the same hourly items, so it shares the cache of
+    resampled hourly forecasts.
     """
-    if key in fetch_from:
-        return fetch_from[key]
-    else:
-        _LOGGER.log( logging.INFO if ignore_errors else logging.WARNING,
-                     f"The key {key} is missing from the following array (DEBUG logging only), causing an error.  "
-                      "It is likely that the WeatherFlow API has changed unexpectedly." )
-        _LOGGER.log( logging.DEBUG if ignore_errors else logging.WARNING, f"{fetch_from}" )
-        if ignore_errors:
-            return default
-        else:
-            _LOGGER.warning( f"You can set the value IGNORE_FETCH_ERRORS in the Config Menu of the WeatherFlow Integration.")
-            raise KeyError(key)
+    copy = replace(entity_data, is_stale=is_stale, data_age=data_age)
+    if isinstance(entity_data, ForecastDescription):
+        copy._resampled = entity_data._resampled  # pylint: disable=protected-access
+    return copy
+
 
 class WeatherFlowApiClient:
     """Base Api Class."""
 
-    req: aiohttp.ClientSession
-
     def __init__(
         self,
         station_id: int,
@@ -72,8 +79,24 @@ class WeatherFlowApiClient:
         units: Optional[str] = UNIT_TYPE_METRIC,
         homeassistant: Optional(bool) = False,
         forecast_hours: Optional[int] = 48,
+        forecast_days: Optional[int] = None,
         session: Optional[aiohttp.ClientSession] = None,
         ignore_fetch_errors: Optional[bool] = True,
+        history_retention: Optional[int] = 3600,
+        history_size: Optional[int] = 720,
+        dns_cache_ttl: Optional[int] = DEFAULT_DNS_CACHE_TTL,
+        keepalive_timeout: Optional[float] = DEFAULT_KEEPALIVE_TIMEOUT,
+        limit_per_host: Optional[int] = DEFAULT_LIMIT_PER_HOST,
+        executor: Optional[Executor] = None,
+        stale_while_revalidate: Optional[int] = None,
+        observation_store: Optional[ObservationStore] = None,
+        adaptive_polling: Optional[bool] = False,
+        event_detector: Optional[EventDetector] = None,
+        shared_cache: Optional[SharedCache] = None,
+        observation_filters: Optional[list] = None,
+        fleet_state: Optional[FleetState] = None,
+        request_timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT,
+        request_hedging: Optional[RequestHedging] = None,
     ) -> None:
         """Initialize Api Class."""
         self.station_id = station_id
@@ -81,27 +104,207 @@ class WeatherFlowApiClient:
         self.ignore_fetch_errors = ignore_fetch_errors
         self.units = units
         self.forecast_hours = forecast_hours
+        self.forecast_days = forecast_days
         self.homeassistant = homeassistant
+        self.executor = executor
+        self.stale_while_revalidate = stale_while_revalidate
+        self.observation_store = observation_store
+        self._poll_interval = AdaptivePollInterval() if adaptive_polling else None
+        self._next_poll = 0.0
+        self.event_detector = event_detector
+        self._events: list = []
+        self.shared_cache = shared_cache
+        self.observation_filters = list(observation_filters or [])
+        self._subscribed = False
+        self.fleet_state = fleet_state
+        self._fleet_key = None if fleet_state is None else fleet_state.register(station_id)
+        self._state: dict = {}
+        self.request_timeout = request_timeout
+        self.request_hedging = request_hedging
+        self._request_kwargs: dict = {}
+        if request_timeout is not None:
+            self._request_kwargs["timeout"] = aiohttp.ClientTimeout(total=request_timeout)
 
         if self.units not in VALID_UNIT_TYPES:
             self.units = UNIT_TYPE_METRIC
 
-        if session is None:
-            session = aiohttp.ClientSession()
-        self.req = session
+        # A session supplied by the caller is never closed by this class. If
+        # none is supplied, one is created on first use inside the event loop
+        # and closed again in close().
+        self._session = session
+        self._owns_session = session is None
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.limit_per_host = limit_per_host
         self.cnv = Conversions(self.units, self.homeassistant)
         self.calc = Calculations()
 
-        self._station_data: StationDescription = None
-        self._observation_data: ObservationDescription = None
+        self._entity_payloads: EntityPayloads = None
+        self._solar_table: SolarTable = None
+        self._history = ObservationHistory(history_retention, history_size)
         self._device_id = None
+        self._fetched_at: dict = {}
+        self._refresh_tasks: dict = {}
+        self._refresh_failed: set = set()
+        self._last_observation: dict = None
+        self._forecast_reduced = False
         self._is_metric = self.units is UNIT_TYPE_METRIC
 
+    async def __aenter__(self) -> WeatherFlowApiClient:
+        """Enter async context."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Exit async context and release the session if we own it."""
+        await self.close()
+
+    @property
+    def req(self) -> aiohttp.ClientSession:
+        """Return the ClientSession, creating it if needed."""
+        if self._session is None or (self._owns_session and self._session.closed):
+            connector = aiohttp.TCPConnector(
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+                limit_per_host=self.limit_per_host,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._owns_session = True
+        return self._session
+
+    async def close(self) -> None:
+        """Close the ClientSession if it was created by this class."""
+        for task in self._refresh_tasks.values():
+            task.cancel()
+        self._refresh_tasks.clear()
+        if self._subscribed:
+            self.shared_cache.unsubscribe(self.station_id)
+            self._subscribed = False
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._owns_session:
+            self._session = None
+        if self._fleet_key is not None:
+            self.fleet_state.release(self._fleet_key)
+            self._fleet_key = None
+
     @property
     def station_data(self) -> StationDescription:
         """Return Station Data."""
+        self._mark_read()
         return self._station_data
 
+    def _get_state(self, kind: str):
+        """Return station, observation or forecast data, from the fleet state if used."""
+        if self.fleet_state is None:
+            return self._state.get(kind)
+        if self._fleet_key is None:
+            return None
+        return self.fleet_state.get(self._fleet_key, kind)
+
+    def _mark_read(self) -> None:
+        """Record in the fleet state that data was handed to the caller."""
+        if self._fleet_key is not None:
+            self.fleet_state.mark_read(self._fleet_key)
+
+    def _set_state(self, kind: str, entity_data) -> None:
+        """Store station, observation or forecast data."""
+        if self.fleet_state is None:
+            self._state[kind] = entity_data
+        elif self._fleet_key is not None:
+            self.fleet_state.put(self._fleet_key, kind, entity_data)
+
+    @property
+    def _station_data(self) -> StationDescription:
+        """Return Station Data held by this client or the fleet state."""
+        return self._get_state("station")
+
+    @_station_data.setter
+    def _station_data(self, entity_data: StationDescription) -> None:
+        """Store Station Data."""
+        self._set_state("station", entity_data)
+
+    @property
+    def _observation_data(self) -> ObservationDescription:
+        """Return Observation Data held by this client or the fleet state."""
+        return self._get_state("observations")
+
+    @_observation_data.setter
+    def _observation_data(self, entity_data: ObservationDescription) -> None:
+        """Store Observation Data."""
+        self._set_state("observations", entity_data)
+
+    @property
+    def _forecast_data(self) -> ForecastDescription:
+        """Return Forecast Data held by this client or the fleet state."""
+        return self._get_state("forecast")
+
+    @_forecast_data.setter
+    def _forecast_data(self, entity_data: ForecastDescription) -> None:
+        """Store Forecast Data."""
+        self._set_state("forecast", entity_data)
+
+    @property
+    def solar_table(self) -> SolarTable:
+        """Return solar times and sun elevation for the station, once initialized."""
+        if self._solar_table is None and self._station_data is not None:
+            self._solar_table = SolarTable(self._station_data)
+        return self._solar_table
+
+    @property
+    def entity_payloads(self) -> EntityPayloads:
+        """Return the cached builder of entity payloads."""
+        if self._entity_payloads is None:
+            self._entity_payloads = EntityPayloads(
+                self.unit_system(), self.homeassistant, self.forecast_builder().attribute_units()
+            )
+        return self._entity_payloads
+
+    def observation_states(self) -> dict:
+        """Return entity states with units for the latest observation."""
+        self._mark_read()
+        return self.entity_payloads.observation_states(self._observation_data)
+
+    def forecast_attributes(self) -> dict:
+        """Return daily and hourly forecast attribute lists for the latest forecast.
+
+        When the forecast was reduced while the station was cold, the full
+        forecast is fetched in the background. Await read_forecast() first to
+        get the full forecast at once.
+        """
+        self._mark_read()
+        if self._forecast_is_reduced():
+            self._start_rehydration()
+        return self.entity_payloads.forecast_attributes(self._forecast_data)
+
+    def _start_rehydration(self) -> None:
+        """Fetch the full forecast in the background, when called in the event loop."""
+        task = self._refresh_tasks.get("rehydrate")
+        if task is not None and not task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        fetch = self._forecast_fetch()
+        self._refresh_tasks["rehydrate"] = loop.create_task(self._revalidate("forecast", fetch))
+
+    @property
+    def poll_interval(self) -> int:
+        """Return the recommended seconds between observation updates."""
+        if self._poll_interval is None:
+            return None
+        return self._poll_interval.interval
+
+    @property
+    def events(self) -> list[EventDescription]:
+        """Return events detected in the latest observation."""
+        return self._events
+
+    @property
+    def history(self) -> ObservationHistory:
+        """Return rolling history of raw observations."""
+        return self._history
+
     @property
     def device_url(self) -> str:
         """Rest Url for device data."""
@@ -127,14 +330,30 @@ class WeatherFlowApiClient:
         data = await self._api_request(self.station_url)
 
         if data is not None:
-            if data["status"]["status_code"] == 404:
-                raise WrongStationID(f"Station ID {self.station_id} does not exist") from None
-            if data["status"]["status_code"] == 401:
-                raise NotAuthorized(f"Token {self.api_token} is invalid") from None
+            endpoint = _endpoint(self.station_url)
+            status = data["status"]["status_code"]
+            if status == 404:
+                raise WrongStationID(
+                    f"Station ID {self.station_id} does not exist",
+                    station_id=self.station_id,
+                    endpoint=endpoint,
+                    status=status,
+                ) from None
+            if status == 401:
+                raise NotAuthorized(
+                    f"The Token supplied is not valid for Station ID {self.station_id}",
+                    station_id=self.station_id,
+                    endpoint=endpoint,
+                    status=status,
+                ) from None
             if data["stations"] == []:
-                raise Invalid(f"The data returned from Station ID {self.station_id} is invalid") from None
+                raise Invalid(
+                    f"The data returned from Station ID {self.station_id} is invalid",
+                    station_id=self.station_id,
+                    endpoint=endpoint,
+                    status=status,
+                ) from None
 
-            device_list = []
             station = data["stations"][0]
             entity_data = StationDescription(
                 key=self.station_id,
@@ -145,6 +364,7 @@ class WeatherFlowApiClient:
                 timezone=station["timezone"],
                 elevation=station["station_meta"]["elevation"],
             )
+            entity_data.max_visibility = self.calc.max_visibility(entity_data.elevation)
             for device in station["devices"]:
                 if device.get("device_type") == "HB":
                     entity_data.hub_device_id = device["device_id"]
@@ -152,285 +372,368 @@ class WeatherFlowApiClient:
                     entity_data.hub_hardware_revision = device["hardware_revision"]
                     entity_data.hub_firmware_revision = device["firmware_revision"]
                     entity_data.hub_serial_number = device["serial_number"]
-                if device.get("device_type") == "ST":
-                    device_data = DeviceDescription(
-                        device_id=device["device_id"],
-                        name=device["device_meta"]["name"],
-                        device_type=DEVICE_TYPE_TEMPEST,
-                        hardware_revision=device["hardware_revision"],
-                        firmware_revision=device["firmware_revision"],
-                        serial_number=device["serial_number"],
-                    )
-                    device_list.append(device_data)
-                    entity_data.is_tempest = True
-                if device.get("device_type") == "AR":
-                    device_data = DeviceDescription(
-                        device_id=device["device_id"],
-                        name=device["device_meta"]["name"],
-                        device_type=DEVICE_TYPE_AIR,
-                        hardware_revision=device["hardware_revision"],
-                        firmware_revision=device["firmware_revision"],
-                        serial_number=device["serial_number"],
-                    )
-                    device_list.append(device_data)
-                if device.get("device_type") == "SK":
-                    device_data = DeviceDescription(
-                        device_id=device["device_id"],
-                        name=device["device_meta"]["name"],
-                        device_type=DEVICE_TYPE_SKY,
-                        hardware_revision=device["hardware_revision"],
-                        firmware_revision=device["firmware_revision"],
-                        serial_number=device["serial_number"],
+                type_description = DEVICE_API_CODES.get(device.get("device_type"))
+                if type_description is not None:
+                    entity_data.add_device(
+                        DeviceDescription(
+                            device_id=device["device_id"],
+                            name=device["device_meta"]["name"],
+                            device_type=type_description.device_type,
+                            hardware_revision=device["hardware_revision"],
+                            firmware_revision=device["firmware_revision"],
+                            serial_number=device["serial_number"],
+                        )
                     )
-                    device_list.append(device_data)
-                entity_data.device_list = device_list
+                    if type_description.device_type == DEVICE_TYPE_TEMPEST:
+                        entity_data.is_tempest = True
 
             self._station_data = entity_data
+            if self.shared_cache is not None:
+                self.shared_cache.authorize(self.station_id, self.api_token)
+                if not self._subscribed:
+                    self.shared_cache.subscribe(self.station_id)
+                    self._subscribed = True
 
-    async def _read_device_data(self) -> None:
+    async def _read_device_data(self, entity_data: ObservationDescription) -> None:
         """Update observation data."""
         for item in self._station_data.device_list:
-            if item.device_type == DEVICE_TYPE_TEMPEST:
-                self._device_id = item.device_id
-                voltage_index = 16
-                data = await self._api_request(self.device_url)
-                if data is not None:
-                    device = data["obs"][0]
-                    self._observation_data.voltage_tempest = device[voltage_index]
-                    self._observation_data.battery_tempest = self.calc.battery_percent(
-                        self._station_data.is_tempest, device[voltage_index]
-                    )
-            if item.device_type == DEVICE_TYPE_AIR:
-                self._device_id = item.device_id
-                voltage_index = 6
-                data = await self._api_request(self.device_url)
-                if data is not None:
-                    device = data["obs"][0]
-                    self._observation_data.voltage_air = device[voltage_index]
-                    self._observation_data.battery_air = self.calc.battery_percent(
-                        self._station_data.is_tempest, device[voltage_index]
-                    )
-            if item.device_type == DEVICE_TYPE_SKY:
-                self._device_id = item.device_id
-                voltage_index = 8
-                data = await self._api_request(self.device_url)
-                if data is not None:
-                    device = data["obs"][0]
-                    self._observation_data.voltage_sky = device[voltage_index]
-                    self._observation_data.battery_sky = self.calc.battery_percent(
-                        self._station_data.is_tempest, device[voltage_index]
-                    )
+            type_description = DEVICE_TYPE_DESCRIPTIONS[item.device_type]
+            self._device_id = item.device_id
+            data = await self._api_request(self.device_url, kind="device")
+            if data is not None:
+                voltage = data["obs"][0][type_description.voltage_index]
+                setattr(entity_data, f"voltage_{item.device_type}", voltage)
+                setattr(
+                    entity_data,
+                    f"battery_{item.device_type}",
+                    self.calc.device_battery_percent(type_description, voltage),
+                )
 
     async def update_observations(self) -> None:
         """Update observation data."""
         if self._station_data is None:
             return
 
-        data = await self._api_request(self.observation_url)
+        if (
+            self._poll_interval is not None
+            and self._observation_data is not None
+            and time.monotonic() < self._next_poll
+        ):
+            return self._observation_data
+
+        fetch = self._observation_fetch()
+        if self.stale_while_revalidate is not None:
+            return await self._serve_stale("observations", fetch)
+        return await fetch()
+
+    def _observation_fetch(self):
+        """Return the method that fetches observation data."""
+        return self._fetch_observations if self.shared_cache is None else self._fetch_observations_shared
+
+    async def _fetch_observations_shared(self) -> ObservationDescription:
+        """Return observation data through the shared cache.
+
+        The cache holds the raw observation next to the processed data, and
+        each client runs its own hooks once for every new observation.
+        """
+        key = (
+            "observations",
+            self.station_id,
+            self.units,
+            self.homeassistant,
+            tuple(self.observation_filters),
+        )
+        result = await self.shared_cache.get(key, self.api_token, self._fetch_observation_data)
+        if result is None:
+            return None
+        obervations, entity_data = result
+        if obervations is not self._last_observation:
+            await self._observation_hooks(obervations, entity_data)
+        self._observation_data = entity_data
+        return entity_data
+
+    async def _fetch_observations(self) -> ObservationDescription:
+        """Fetch and process observation data."""
+        result = await self._fetch_observation_data()
+        if result is None:
+            return None
+        obervations, entity_data = result
+        await self._observation_hooks(obervations, entity_data)
+        self._observation_data = entity_data
+        return entity_data
+
+    async def _observation_hooks(self, obervations: dict, entity_data: ObservationDescription) -> None:
+        """Pass a raw observation to the history, store, event detector and poll interval."""
+        self._last_observation = obervations
+        try:
+            self._history.add(obervations)
+            if self.observation_store is not None:
+                await self.observation_store.append_async(self.station_id, obervations)
+            if self.event_detector is not None:
+                self._events = self.event_detector.update(obervations)
+            if self._poll_interval is not None:
+                interval = self._poll_interval.update(obervations, entity_data.battery_mode)
+                self._next_poll = time.monotonic() + interval
+        except WeatherFlowError:
+            raise
+        except Exception as err:
+            raise Invalid(
+                f"Error occured processing data. Error message: {err}",
+                station_id=self.station_id,
+                endpoint=_endpoint(self.observation_url),
+            ) from err
+
+    async def _fetch_observation_data(self) -> tuple[dict, ObservationDescription]:
+        """Fetch observation data and return the raw observation with the processed data."""
+        endpoint = _endpoint(self.observation_url)
+        data = await self._api_request(self.observation_url, kind="observations")
         try:
             if data is not None:
                 obervations: dict = data['obs'][0]
+                for observation_filter in self.observation_filters:
+                    obervations = observation_filter(obervations)
 
-                beaufort_data: BeaufortDescription = self.calc.beaufort_value(obervations.get("wind_avg"))
-                cloudbase = self.calc.cloud_base(obervations.get("air_temperature"), obervations.get("dew_point"), self._station_data.elevation)
-                freezingline = self.calc.freezing_line(obervations.get("air_temperature"), self._station_data.elevation)
-                visibility = self.calc.visibility(
-                    self._station_data.elevation,
-                    obervations.get("air_temperature"),
-                    obervations.get("relative_humidity"),
-                    obervations.get("dew_point")
-                )
-                
-                entity_data = ObservationDescription(
-                    key=self.station_id,
-                    station_name=self._station_data.name,
-                    utc_time=self.cnv.utc_from_timestamp(obervations.get("timestamp")),
-                    air_temperature=self.cnv.temperature(obervations.get("air_temperature")),
-                    barometric_pressure=self.cnv.pressure(obervations.get("barometric_pressure")),
-                    station_pressure=self.cnv.pressure(obervations.get("station_pressure")),
-                    sea_level_pressure=self.cnv.pressure(obervations.get("sea_level_pressure")),
-                    relative_humidity=obervations.get("relative_humidity"),
-                    precip=self.cnv.rain(obervations.get("precip")),
-                    precip_rate=self.cnv.rain_rate(obervations.get("precip")),
-                    precip_intensity=self.calc.precip_intensity(obervations.get("precip")),
-                    precip_accum_last_1hr=self.cnv.rain(obervations.get("precip_accum_last_1hr")),
-                    precip_accum_local_day=self.cnv.rain(obervations.get("precip_accum_local_day")),
-                    precip_accum_local_day_final=self.cnv.rain(obervations.get("precip_accum_local_day_final")),
-                    precip_accum_local_yesterday=self.cnv.rain(obervations.get("precip_accum_local_yesterday")),
-                    precip_accum_local_yesterday_final=self.cnv.rain(obervations.get("precip_accum_local_yesterday_final")),
-                    precip_minutes_local_day=obervations.get("precip_minutes_local_day"),
-                    precip_minutes_local_yesterday=obervations.get("precip_minutes_local_yesterday"),
-                    precip_minutes_local_yesterday_final=obervations.get("precip_minutes_local_yesterday_final"),
-                    wind_avg=self.cnv.windspeed(obervations.get("wind_avg")),
-                    wind_avg_kmh=self.cnv.windspeed_kmh(obervations.get("wind_avg")),
-                    wind_avg_knots=self.cnv.windspeed_knots(obervations.get("wind_avg")),
-                    wind_direction=obervations.get("wind_direction"),
-                    wind_cardinal=self.calc.wind_direction(obervations.get("wind_direction")),
-                    wind_gust=self.cnv.windspeed(obervations.get("wind_gust")),
-                    wind_gust_kmh=self.cnv.windspeed_kmh(obervations.get("wind_gust")),
-                    wind_gust_knots=self.cnv.windspeed_knots(obervations.get("wind_gust")),
-                    wind_lull=self.cnv.windspeed(obervations.get("wind_lull")),
-                    wind_lull_kmh=self.cnv.windspeed_kmh(obervations.get("wind_lull")),
-                    wind_lull_knots=self.cnv.windspeed_knots(obervations.get("wind_lull")),
-                    solar_radiation=obervations.get("solar_radiation"),
-                    uv=self.cnv.uv_index(obervations.get("uv")),
-                    uv_description=self.calc.uv_description(obervations.get("uv")),
-                    brightness=obervations.get("brightness"),
-                    lightning_strike_last_epoch=self.cnv.utc_from_timestamp_to_date(
-                        obervations.get("lightning_strike_last_epoch")
-                    ),
-                    lightning_strike_last_distance=self.cnv.distance(
-                        obervations.get("lightning_strike_last_distance")
-                    ),
-                    lightning_strike_count=obervations.get("lightning_strike_count"),
-                    lightning_strike_count_last_1hr=obervations.get("lightning_strike_count_last_1hr"),
-                    lightning_strike_count_last_3hr=obervations.get("lightning_strike_count_last_3hr"),
-                    feels_like=self.cnv.temperature(obervations.get("feels_like")),
-                    heat_index=self.cnv.temperature(obervations.get("heat_index")),
-                    wind_chill=self.cnv.temperature(obervations.get("wind_chill")),
-                    dew_point=self.cnv.temperature(obervations.get("dew_point")),
-                    wet_bulb_temperature=self.cnv.temperature(obervations.get("wet_bulb_temperature")),
-                    delta_t=obervations.get("delta_t"),
-                    air_density=self.cnv.density(obervations.get("air_density")),
-                    pressure_trend=obervations.get("pressure_trend"),
-                    is_raining=self.calc.is_raining(obervations.get("precip")),
-                    is_freezing=self.calc.is_freezing(obervations.get("air_temperature")),
-                    is_lightning=self.calc.is_lightning(obervations.get("lightning_strike_count")),
-                    visibility=self.cnv.distance(visibility),
-                    absolute_humidity=self.calc.absolute_humidity(
-                        obervations.get("air_temperature"), obervations.get("relative_humidity")
-                    ),
-                    beaufort=beaufort_data.value,
-                    beaufort_description=beaufort_data.description,
-                    cloud_base=self.cnv.altitude(cloudbase),
-                    freezing_line=self.cnv.altitude(freezingline),
-                )
-
-                self._observation_data = entity_data
-                await self._read_device_data()
+                entity_data = self.observation_builder().build(obervations)
+                await self._read_device_data(entity_data)
 
                 # Update Tempest Specific Data
                 if self._station_data.is_tempest:
                     battery_mode, battery_mode_description = self.calc.battery_mode(
-                        self._observation_data.voltage_tempest,
+                        entity_data.voltage_tempest,
                         obervations.get("solar_radiation")
                     )
                     entity_data.battery_mode = battery_mode
                     entity_data.battery_mode_description = battery_mode_description
 
-                return self._observation_data
-        except IndexError as err:
-            error_message = "Empty dataset returned from WeatherFlow. Make sure the station is online."
-            raise Invalid(error_message) from None
-        except KeyError as err:
+                return obervations, entity_data
+        except (IndexError, KeyError) as err:
             error_message = "Empty dataset returned from WeatherFlow. Make sure the station is online."
-            raise Invalid(error_message) from None
+            raise Invalid(error_message, station_id=self.station_id, endpoint=endpoint) from err
         except TypeError as err:
             error_message = "Timeout fetching weatherflow data."
-            raise Invalid(error_message) from None
+            raise Invalid(error_message, station_id=self.station_id, endpoint=endpoint) from err
+        except WeatherFlowError:
+            raise
         except Exception as err:
-            raise Invalid(f"Error occured processing data. Error message: {err}") from None
+            raise Invalid(
+                f"Error occured processing data. Error message: {err}",
+                station_id=self.station_id,
+                endpoint=endpoint,
+            ) from err
 
         return None
 
+    def observation_builder(self) -> ObservationBuilder:
+        """Return an ObservationBuilder with the current settings."""
+        return ObservationBuilder(self._station_data, self.units, self.homeassistant)
+
+    def _effective_forecast_hours(self) -> int:
+        """Return the hours of hourly forecast to build, reduced for a cold fleet slot."""
+        if self._fleet_key is not None:
+            return self.fleet_state.forecast_hours(self._fleet_key, self.forecast_hours)
+        return self.forecast_hours
+
+    def forecast_builder(self) -> ForecastBuilder:
+        """Return a ForecastBuilder with the current settings."""
+        return ForecastBuilder(
+            self.station_id,
+            self.units,
+            self.homeassistant,
+            self._effective_forecast_hours(),
+            self.forecast_days,
+            self.ignore_fetch_errors,
+        )
+
     async def update_forecast(self) -> None:
         """Update forecast data."""
         if self._station_data is None:
             return
 
-        try:
-            data = await self._api_request(self.forecast_url)
-            if data is not None:
-                current: dict = data['current_conditions']
-                entity_data = ForecastDescription(
-                    key=self.station_id,
-                    utc_time=self.cnv.utc_from_timestamp(current.get("time")),
-                    conditions=current.get("conditions"),
-                    icon=current.get("icon"),
-                    air_temperature=self.cnv.temperature(current.get("air_temperature")),
-                    station_pressure=self.cnv.pressure(current.get("station_pressure")),
-                    sea_level_pressure=self.cnv.pressure(current.get("sea_level_pressure")),
-                    pressure_trend=current.get("pressure_trend"),
-                    relative_humidity=current.get("relative_humidity"),
-                    wind_avg=self.cnv.windspeed(current.get("wind_avg"), self.homeassistant),
-                    wind_direction=current.get("wind_direction"),
-                    wind_direction_cardinal=current.get("wind_direction_cardinal"),
-                    wind_gust=self.cnv.windspeed(current.get("wind_gust"), self.homeassistant),
-                    solar_radiation=current.get("solar_radiation"),
-                    uv=current.get("uv"),
-                    brightness=current.get("brightness"),
-                    feels_like=self.cnv.temperature(current.get("feels_like")),
-                    dew_point=self.cnv.temperature(current.get("dew_point")),
-                    wet_bulb_temperature=self.cnv.temperature(current.get("wet_bulb_temperature")),
-                    delta_t=current.get("delta_t"),
-                    air_density=self.cnv.density(current.get("air_density")),
-                    lightning_strike_count_last_1hr=current.get("lightning_strike_count_last_1hr"),
-                    lightning_strike_count_last_3hr=current.get("lightning_strike_count_last_3hr"),
-                    lightning_strike_last_distance=current.get("lightning_strike_last_distance"),
-                    lightning_strike_last_distance_msg=current.get("lightning_strike_last_distance_msg"),
-                    lightning_strike_last_epoch=self.cnv.utc_from_timestamp_to_date(
-                        current.get("lightning_strike_last_epoch")
-                    ),
-                    precip_accum_local_day=self.cnv.rain(current.get("precip_accum_local_day")),
-                    precip_accum_local_yesterday=self.cnv.rain(current.get("precip_accum_local_yesterday")),
-                    precip_minutes_local_day=current.get("precip_minutes_local_day"),
-                    precip_minutes_local_yesterday=current.get("precip_minutes_local_yesterday"),
-                )
+        fetch = self._forecast_fetch()
+        if self.stale_while_revalidate is not None:
+            return await self._serve_stale("forecast", fetch)
+        return await fetch()
 
-                forecast_daily = data["forecast"]["daily"]
-
-                entity_data.temp_high_today = forecast_daily[0]["air_temp_high"]
-                entity_data.temp_low_today = forecast_daily[0]["air_temp_low"]
-
-                for item in forecast_daily:
-                    calc_values = self.calc.day_forecast_extras(item, data["forecast"]["hourly"])
-                    if calc_values is not None:
-                        day_item = ForecastDailyDescription(
-                            utc_time=self.cnv.utc_from_timestamp(item["day_start_local"]),
-                            conditions=item["conditions"],
-                            icon="cloudy" if item.get("icon") is None else item.get("icon"),
-                            sunrise=item["sunrise"],
-                            sunset=item["sunset"],
-                            air_temp_high=self.cnv.temperature(item["air_temp_high"]),
-                            air_temp_low=self.cnv.temperature(item["air_temp_low"]),
-                            precip=self.cnv.rain(calc_values["precip"]),
-                            precip_probability=item["precip_probability"],
-                            wind_avg=self.cnv.windspeed(calc_values["wind_avg"], self.homeassistant),
-                            wind_direction=calc_values["wind_direction"],
-                        )
-                        entity_data.forecast_daily.append(day_item)
-
-                forecast_hourly = data["forecast"]["hourly"]
-                hour_cnt = 1
-                for item in forecast_hourly:
-                    hour_item = ForecastHourlyDescription(
-                        utc_time=self.cnv.utc_from_timestamp(item["time"]),
-                        conditions=resilient_fetch(item, "conditions", "Data Error", self.ignore_fetch_errors),
-                        icon="cloudy" if item.get("icon") is None else item.get("icon"),
-                        air_temperature=self.cnv.temperature(resilient_fetch(item, "air_temperature", 20.0, self.ignore_fetch_errors)),
-                        sea_level_pressure=self.cnv.pressure(resilient_fetch(item, "sea_level_pressure", 0, self.ignore_fetch_errors)),
-                        relative_humidity=resilient_fetch(item, "relative_humidity", 0, self.ignore_fetch_errors),
-                        precip=self.cnv.rain(resilient_fetch(item, "precip", 0, self.ignore_fetch_errors)),
-                        precip_probability=resilient_fetch(item, "precip_probability", 0, self.ignore_fetch_errors),
-                        wind_avg=self.cnv.windspeed(resilient_fetch(item, "wind_avg", 0, self.ignore_fetch_errors), self.homeassistant),
-                        wind_direction=resilient_fetch(item, "wind_direction", 0, self.ignore_fetch_errors),
-                        wind_direction_cardinal=resilient_fetch(item, "wind_direction_cardinal", "N", self.ignore_fetch_errors),
-                        wind_gust=self.cnv.windspeed(resilient_fetch(item, "wind_gust", 0.0, self.ignore_fetch_errors), self.homeassistant),
-                        uv=resilient_fetch(item, "uv", 0, self.ignore_fetch_errors),
-                        feels_like=self.cnv.temperature(resilient_fetch(item, "feels_like", 20.0, self.ignore_fetch_errors), True),
-                    )
-                    entity_data.forecast_hourly.append(hour_item)
-                    if hour_cnt >= self.forecast_hours:
-                        break
-                    hour_cnt += 1
+    async def read_observations(self) -> ObservationDescription:
+        """Return observation data for a consumer.
 
-                return entity_data
+        Marks the station as read in the fleet state, and fetches the data
+        first when the fleet state dropped it.
+        """
+        self._mark_read()
+        if self._station_data is None:
+            return None
+        entity_data = self._observation_data
+        if entity_data is None:
+            entity_data = await self._observation_fetch()()
+        return entity_data
+
+    async def read_forecast(self) -> ForecastDescription:
+        """Return forecast data for a consumer.
+
+        Marks the station as read in the fleet state. When the forecast was
+        dropped, or reduced to cold_forecast_hours while the station was cold,
+        the full forecast is fetched first.
+        """
+        self._mark_read()
+        if self._station_data is None:
+            return None
+        entity_data = self._forecast_data
+        if entity_data is None or self._forecast_is_reduced():
+            entity_data = await self._forecast_fetch()()
+        return entity_data
+
+    def _forecast_is_reduced(self) -> bool:
+        """Return True if the held forecast is shorter than forecast_hours because the station was cold."""
+        if self._fleet_key is None:
+            return False
+        return self._forecast_reduced or self.fleet_state.is_trimmed(self._fleet_key)
+
+    def _forecast_fetch(self):
+        """Return the method that fetches forecast data."""
+        return self._fetch_forecast if self.shared_cache is None else self._fetch_forecast_shared
+
+    async def _fetch_forecast_shared(self) -> ForecastDescription:
+        """Return forecast data through the shared cache."""
+        key = (
+            "forecast",
+            self.station_id,
+            self.units,
+            self.homeassistant,
+            self._effective_forecast_hours(),
+            self.forecast_days,
+            self.ignore_fetch_errors,
+        )
+        entity_data = await self.shared_cache.get(key, self.api_token, self._fetch_forecast)
+        if entity_data is not None:
+            self._forecast_data = entity_data
+            self._forecast_reduced = key[4] < self.forecast_hours
+        return entity_data
+
+    async def _fetch_forecast(self) -> ForecastDescription:
+        """Fetch and process forecast data."""
+        entity_data = None
+        builder = self.forecast_builder()
+        try:
+            if self.executor is not None:
+                raw = await self._api_request(self.forecast_url, decode=False, kind="forecast")
+                if raw is not None:
+                    loop = asyncio.get_running_loop()
+                    entity_data, drift = await loop.run_in_executor(
+                        self.executor,
+                        builder.decode_and_build,
+                        raw,
+                        _endpoint(self.forecast_url),
+                    )
+                    FETCH_DRIFT.add(drift, logging.INFO if self.ignore_fetch_errors else logging.WARNING)
+                    if isinstance(entity_data, bytes):
+                        entity_data = snapshot.loads(entity_data)
+            else:
+                data = await self._api_request(self.forecast_url, kind="forecast")
+                if data is not None:
+                    entity_data = builder.build(data)
+        except WeatherFlowError:
+            raise
         except Exception as err:
-            raise Invalid(f"Error occured processing forecast data. Error message: {err}") from None
+            raise Invalid(
+                f"Error occured processing forecast data. Error message: {err}",
+                station_id=self.station_id,
+                endpoint=_endpoint(self.forecast_url),
+            ) from err
+
+        if entity_data is not None:
+            self._forecast_data = entity_data
+            self._forecast_reduced = builder.forecast_hours < self.forecast_hours
+        return entity_data
+
+    async def iter_forecast_hourly(self):
+        """Yield hourly forecast items one at a time.
+
+        The response is decoded in full, but items are only converted as the
+        consumer asks for them, so the converted hourly forecast is never held
+        in memory as a whole. The request always goes to WeatherFlow and the
+        conversion runs on the event loop: the shared cache and the executor
+        are not used, and the stored forecast data is not updated.
+        """
+        if self._station_data is None:
+            return
 
-        return None
+        data = await self._api_request(self.forecast_url, kind="forecast")
+        if data is None:
+            return
+
+        builder = self.forecast_builder()
+        try:
+            hourly = data["forecast"]["hourly"][: builder.forecast_hours]
+        except Exception as err:
+            raise Invalid(
+                f"Error occured processing forecast data. Error message: {err}",
+                station_id=self.station_id,
+                endpoint=_endpoint(self.forecast_url),
+            ) from err
+        del data
+
+        for item in hourly:
+            try:
+                hour_item = builder.hourly_item(item)
+            except WeatherFlowError:
+                raise
+            except Exception as err:
+                raise Invalid(
+                    f"Error occured processing forecast data. Error message: {err}",
+                    station_id=self.station_id,
+                    endpoint=_endpoint(self.forecast_url),
+                ) from err
+            yield hour_item
+
+    async def _serve_stale(self, key: str, fetch) -> None:
+        """Return last good data at once and refresh it in the background.
+
+        Data older than stale_while_revalidate seconds is not served, and the
+        caller waits for a fresh fetch instead. Served data is marked stale
+        when it is older than a regular refresh would leave it, or when the
+        last background refresh failed. The data can be shared with other
+        clients, so the staleness markers are set on a copy.
+        """
+        entity_data = self._get_state(key)
+        fetched_at = self._fetched_at.get(key)
+        if entity_data is not None and fetched_at is not None:
+            age = time.monotonic() - fetched_at
+            if age <= self.stale_while_revalidate:
+                task = self._refresh_tasks.get(key)
+                if task is None or task.done():
+                    self._refresh_tasks[key] = asyncio.create_task(self._revalidate(key, fetch))
+                is_stale = key in self._refresh_failed or age > DEFAULT_STALE_AFTER[key]
+                return _marked_copy(entity_data, is_stale, age)
+
+        entity_data = await fetch()
+        if entity_data is not None:
+            self._fetched_at[key] = time.monotonic()
+            self._refresh_failed.discard(key)
+            entity_data = _marked_copy(entity_data, False, 0.0)
+        return entity_data
+
+    async def _revalidate(self, key: str, fetch) -> None:
+        """Refresh cached data in the background."""
+        try:
+            entity_data = await fetch()
+        except WeatherFlowError as err:
+            _LOGGER.debug("Background refresh of %s failed: %s", key, err)
+            self._refresh_failed.add(key)
+            return
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Unexpected error in background refresh of %s", key)
+            self._refresh_failed.add(key)
+            return
+        if entity_data is not None:
+            self._fetched_at[key] = time.monotonic()
+            self._refresh_failed.discard(key)
 
     async def load_unit_system(self) -> None:
+        """Return unit of meassurement based on unit system."""
+        return self.unit_system()
+
+    def unit_system(self) -> dict:
         """Return unit of meassurement based on unit system."""
         density_unit = "kg/m³" if self._is_metric else "lb/ft³"
         distance_unit = "km" if self._is_metric else "mi"
@@ -458,16 +761,88 @@ class WeatherFlowApiClient:
 
     async def _api_request(
         self,
-        url: str
+        url: str,
+        decode: bool = True,
+        kind: str | None = None,
     ) -> None:
-        """Get data from WeatherFlow API."""
+        """Get data from WeatherFlow API.
+
+        With decode set to False the raw response body is returned. Requests
+        of a kind listed in request_hedging are hedged.
+        """
+        endpoint = _endpoint(url)
         try:
-            async with self.req.get(url) as resp:
-                data = await resp.json()
-                if data.get("status") is not None:
-                    if data["status"]["status_code"] == 401:
-                        raise NotAuthorized("The Token supplied is not valid for the Station ID. Cannot continue.")
-                return data
+            if self.request_hedging is not None and kind in self.request_hedging.kinds:
+                return await self._hedged_request(url, decode, endpoint, kind)
+            return await self._request(url, decode, endpoint)
 
         except client_exceptions.ClientError as err:
-            raise BadRequest(f"Error requesting data from WeatherFlow: {err}") from None
+            raise BadRequest(
+                f"Error requesting data from WeatherFlow: {err}",
+                station_id=self.station_id,
+                endpoint=endpoint,
+                status=getattr(err, "status", None),
+            ) from None
+        except asyncio.TimeoutError:
+            raise BadRequest(
+                f"Timeout requesting data from WeatherFlow after {self.request_timeout} seconds",
+                station_id=self.station_id,
+                endpoint=endpoint,
+            ) from None
+
+    async def _request(self, url: str, decode: bool, endpoint: str):
+        """Send a single GET request and return the response data."""
+        async with self.req.get(url, **self._request_kwargs) as resp:
+            if not decode:
+                return await resp.read()
+            data = await resp.json()
+            if data.get("status") is not None:
+                if data["status"]["status_code"] == 401:
+                    raise NotAuthorized(
+                        "The Token supplied is not valid for the Station ID. Cannot continue.",
+                        station_id=self.station_id,
+                        endpoint=endpoint,
+                        status=resp.status,
+                    )
+            return data
+
+    async def _hedged_request(self, url: str, decode: bool, endpoint: str, kind: str):
+        """Send a GET request, and a duplicate if the first one is slow.
+
+        The first successful response is returned and the other request is
+        cancelled. An error is only raised when both requests failed, unless
+        it is a WeatherFlow error, which a duplicate would get as well.
+        """
+        hedging = self.request_hedging
+        hedging.add_request()
+        primary = asyncio.ensure_future(self._request(url, decode, endpoint))
+        started = {primary: time.monotonic()}
+        pending = {primary}
+        try:
+            delay = hedging.delay(kind)
+            if delay is not None:
+                done, pending = await asyncio.wait(pending, timeout=delay)
+                if not done and hedging.try_hedge():
+                    hedge = asyncio.ensure_future(self._request(url, decode, endpoint))
+                    started[hedge] = time.monotonic()
+                    pending.add(hedge)
+                else:
+                    pending |= done
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task_error = task.exception()
+                    if task_error is None:
+                        hedging.record(kind, time.monotonic() - started[task])
+                        if task is not primary:
+                            hedging.hedge_wins += 1
+                        return task.result()
+                    if isinstance(task_error, WeatherFlowError):
+                        raise task_error
+                    error = error or task_error
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
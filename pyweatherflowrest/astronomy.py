@@ -0,0 +1,163 @@
+"""Sun position and clear sky radiation for a station."""
+from __future__ import annotations
+
+from collections import OrderedDict
+import datetime as dt
+import math
+
+from pyweatherflowrest.data import SolarDayDescription, SolarHourDescription, StationDescription
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8, local days fall back to UTC
+    ZoneInfo = None
+
+UTC = dt.timezone.utc
+
+# Zenith angle used for sunrise and sunset, including refraction.
+SUNRISE_ZENITH = 90.833
+
+
+def _sun_parameters(epoch: float) -> tuple:
+    """Return solar declination (radians) and equation of time (minutes).
+
+    Based on the NOAA solar calculator.
+    """
+    julian_century = (epoch / 86400 + 2440587.5 - 2451545) / 36525
+    mean_long = math.radians((280.46646 + julian_century * (36000.76983 + julian_century * 0.0003032)) % 360)
+    mean_anom = math.radians(357.52911 + julian_century * (35999.05029 - 0.0001537 * julian_century))
+    eccent = 0.016708634 - julian_century * (0.000042037 + 0.0000001267 * julian_century)
+    center = (
+        math.sin(mean_anom) * (1.914602 - julian_century * (0.004817 + 0.000014 * julian_century))
+        + math.sin(2 * mean_anom) * (0.019993 - 0.000101 * julian_century)
+        + math.sin(3 * mean_anom) * 0.000289
+    )
+    omega = math.radians(125.04 - 1934.136 * julian_century)
+    app_long = math.radians(math.degrees(mean_long) + center - 0.00569 - 0.00478 * math.sin(omega))
+    obliq = math.radians(
+        23
+        + (26 + (21.448 - julian_century * (46.815 + julian_century * (0.00059 - julian_century * 0.001813))) / 60) / 60
+        + 0.00256 * math.cos(omega)
+    )
+    declination = math.asin(math.sin(obliq) * math.sin(app_long))
+    var_y = math.tan(obliq / 2) ** 2
+    eq_time = 4 * math.degrees(
+        var_y * math.sin(2 * mean_long)
+        - 2 * eccent * math.sin(mean_anom)
+        + 4 * eccent * var_y * math.sin(mean_anom) * math.cos(2 * mean_long)
+        - 0.5 * var_y * var_y * math.sin(4 * mean_long)
+        - 1.25 * eccent * eccent * math.sin(2 * mean_anom)
+    )
+    return declination, eq_time
+
+
+def solar_elevation(epoch: float, latitude: float, longitude: float) -> float:
+    """Return the solar elevation in degrees, without refraction."""
+    declination, eq_time = _sun_parameters(epoch)
+    true_solar_minutes = ((epoch % 86400) / 60 + eq_time + 4 * longitude) % 1440
+    hour_angle = math.radians(true_solar_minutes / 4 - 180)
+    lat = math.radians(latitude)
+    cos_zenith = math.sin(lat) * math.sin(declination) + math.cos(lat) * math.cos(declination) * math.cos(hour_angle)
+    return 90 - math.degrees(math.acos(max(-1.0, min(1.0, cos_zenith))))
+
+
+def clear_sky_radiation(elevation: float) -> float:
+    """Return global horizontal clear sky radiation in W/m² (Haurwitz model)."""
+    if elevation is None or elevation <= 0:
+        return 0.0
+    cos_zenith = math.sin(math.radians(elevation))
+    return 1098 * cos_zenith * math.exp(-0.059 / cos_zenith)
+
+
+class SolarTable:
+    """Solar times, elevation and clear sky radiation per hour for a station.
+
+    Days are local to the station timezone and are calculated once and kept
+    for the last max_days days used.
+    """
+
+    def __init__(self, station: StationDescription, max_days: int = 16) -> None:
+        """Initialize the table."""
+        self.latitude = station.latitude
+        self.longitude = station.longitude
+        self.tzinfo = UTC
+        if ZoneInfo is not None and station.timezone:
+            self.tzinfo = ZoneInfo(station.timezone)
+        self.max_days = max_days
+        self._days: OrderedDict = OrderedDict()
+
+    def local_date(self, epoch: float) -> dt.date:
+        """Return the station local date of a timestamp."""
+        return dt.datetime.fromtimestamp(epoch, self.tzinfo).date()
+
+    def day(self, date: dt.date) -> SolarDayDescription:
+        """Return solar data for a local date."""
+        cached = self._days.get(date)
+        if cached is not None:
+            self._days.move_to_end(date)
+            return cached
+
+        day_data = self._calculate_day(date)
+        self._days[date] = day_data
+        if len(self._days) > self.max_days:
+            self._days.popitem(last=False)
+        return day_data
+
+    def at(self, epoch: float) -> SolarHourDescription:
+        """Return solar data for the local hour containing a timestamp."""
+        day_data = self.day(self.local_date(epoch))
+        index = int((epoch - day_data.hourly[0].timestamp) // 3600)
+        return day_data.hourly[max(0, min(index, len(day_data.hourly) - 1))]
+
+    def clear_sky_index(self, epoch: float, solar_radiation: float | None) -> float | None:
+        """Return measured solar radiation as a fraction of the clear sky value."""
+        expected = self.at(epoch).clear_sky_radiation
+        if solar_radiation is None or not expected:
+            return None
+        return round(solar_radiation / expected, 2)
+
+    def for_forecast(self, forecast) -> list[SolarHourDescription]:
+        """Return solar data for each hourly row of a ForecastDescription."""
+        return [
+            self.at(dt.datetime.fromisoformat(item.utc_time).timestamp())
+            for item in forecast.forecast_hourly
+            if item.utc_time is not None
+        ]
+
+    def _calculate_day(self, date: dt.date) -> SolarDayDescription:
+        """Calculate solar data for a local date."""
+        start = int(dt.datetime(date.year, date.month, date.day, tzinfo=self.tzinfo).timestamp())
+        next_date = date + dt.timedelta(days=1)
+        end = int(dt.datetime(next_date.year, next_date.month, next_date.day, tzinfo=self.tzinfo).timestamp())
+
+        # Solar noon, sunrise and sunset from the sun parameters at UTC noon
+        # of the date, which is accurate to well within a minute.
+        utc_midnight = int(dt.datetime(date.year, date.month, date.day, tzinfo=UTC).timestamp())
+        declination, eq_time = _sun_parameters(utc_midnight + 43200)
+        solar_noon = utc_midnight + (720 - 4 * self.longitude - eq_time) * 60
+        lat = math.radians(self.latitude)
+        cos_hour_angle = math.cos(math.radians(SUNRISE_ZENITH)) / (
+            math.cos(lat) * math.cos(declination)
+        ) - math.tan(lat) * math.tan(declination)
+
+        day_data = SolarDayDescription(date=date.isoformat(), solar_noon=int(solar_noon))
+        if cos_hour_angle > 1:
+            day_data.day_length = 0
+        elif cos_hour_angle < -1:
+            day_data.day_length = 86400
+        else:
+            half_day = math.degrees(math.acos(cos_hour_angle)) * 4 * 60
+            day_data.sunrise = int(solar_noon - half_day)
+            day_data.sunset = int(solar_noon + half_day)
+            day_data.day_length = day_data.sunset - day_data.sunrise
+
+        for timestamp in range(start, end, 3600):
+            elevation = solar_elevation(timestamp + 1800, self.latitude, self.longitude)
+            day_data.hourly.append(
+                SolarHourDescription(
+                    timestamp=timestamp,
+                    elevation=round(elevation, 2),
+                    clear_sky_radiation=round(clear_sky_radiation(elevation), 1),
+                )
+            )
+        return day_data
@@ -0,0 +1,232 @@
+"""Record WeatherFlow responses and replay them to profile the client.
+
+Record the responses for a station once, then replay them offline through
+initialize, update_observations and update_forecast::
+
+    python -m pyweatherflowrest.bench record STATION_ID TOKEN captures/
+    python -m pyweatherflowrest.bench replay captures/ --iterations 200
+
+Replay prints the time per refresh, a cProfile summary, the objects a
+refresh leaves alive and the tracemalloc allocation sites. With --initialize
+every refresh also runs initialize.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+from collections import Counter
+import datetime as dt
+import gc
+import io
+import json
+import os
+import pstats
+import statistics
+import sys
+import time
+import tracemalloc
+
+from pyweatherflowrest.api import WeatherFlowApiClient
+from pyweatherflowrest.exceptions import NotAuthorized, WeatherFlowError
+
+CAPTURE_META = "capture.json"
+REST_PATH = "/swd/rest/"
+
+
+def capture_name(url: str) -> str:
+    """Return the capture file name for a request url.
+
+    The query string holds the token and is never part of the name.
+    """
+    path = url.split("?")[0]
+    path = path.split(REST_PATH, 1)[-1]
+    return f"{path.strip('/').replace('/', '_')}.json"
+
+
+class RecordingClient(WeatherFlowApiClient):
+    """Client that writes every response to a capture directory."""
+
+    def __init__(self, *args, capture_dir: str, **kwargs) -> None:
+        """Initialize the client."""
+        super().__init__(*args, **kwargs)
+        self.capture_dir = capture_dir
+
+    async def _request(self, url: str, decode: bool, endpoint: str):
+        """Send the request and store the response."""
+        data = await super()._request(url, decode, endpoint)
+        raw = data if isinstance(data, bytes) else json.dumps(data).encode()
+        with open(os.path.join(self.capture_dir, capture_name(url)), "wb") as file:
+            file.write(raw)
+        return data
+
+
+class ReplayClient(WeatherFlowApiClient):
+    """Client that answers requests from a capture directory."""
+
+    def __init__(self, *args, capture_dir: str, **kwargs) -> None:
+        """Initialize the client and load the captures."""
+        super().__init__(*args, **kwargs)
+        self.captures: dict[str, bytes] = {}
+        for name in os.listdir(capture_dir):
+            if name.endswith(".json") and name != CAPTURE_META:
+                with open(os.path.join(capture_dir, name), "rb") as file:
+                    self.captures[name] = file.read()
+
+    async def _request(self, url: str, decode: bool, endpoint: str):
+        """Return the captured response, decoded like a live response."""
+        raw = self.captures.get(capture_name(url))
+        if raw is None:
+            raise WeatherFlowError(f"No capture for {endpoint}")
+        if not decode:
+            return raw
+        data = json.loads(raw)
+        if data.get("status") is not None:
+            if data["status"]["status_code"] == 401:
+                raise NotAuthorized(
+                    "The Token supplied is not valid for the Station ID. Cannot continue.",
+                    station_id=self.station_id,
+                    endpoint=endpoint,
+                    status=401,
+                )
+        return data
+
+
+async def record(args: argparse.Namespace) -> None:
+    """Fetch all data for a station once and store the responses."""
+    os.makedirs(args.directory, exist_ok=True)
+    async with RecordingClient(
+        args.station_id,
+        args.token,
+        units=args.units,
+        forecast_hours=args.forecast_hours,
+        capture_dir=args.directory,
+    ) as client:
+        await client.initialize()
+        await client.update_observations()
+        await client.update_forecast()
+
+    with open(os.path.join(args.directory, CAPTURE_META), "w", encoding="utf-8") as file:
+        json.dump(
+            {"station_id": args.station_id, "recorded": dt.datetime.now(dt.timezone.utc).isoformat()},
+            file,
+        )
+    print(f"Recorded {len(os.listdir(args.directory)) - 1} responses to {args.directory}")
+
+
+async def refresh(client: WeatherFlowApiClient, initialize: bool = False) -> None:
+    """Run one observation and forecast refresh, optionally with initialize."""
+    if initialize:
+        await client.initialize()
+    await client.update_observations()
+    await client.update_forecast()
+
+
+async def replay(args: argparse.Namespace) -> None:
+    """Replay captured responses and print profiling summaries."""
+    with open(os.path.join(args.directory, CAPTURE_META), encoding="utf-8") as file:
+        meta = json.load(file)
+
+    client = ReplayClient(
+        meta["station_id"],
+        "replay",
+        units=args.units,
+        homeassistant=args.homeassistant,
+        forecast_hours=args.forecast_hours,
+        capture_dir=args.directory,
+    )
+    await client.initialize()
+    await refresh(client)
+
+    timings = []
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        await refresh(client, args.initialize)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"Refresh time over {args.iterations} iterations (ms)")
+    print(
+        f"  mean {statistics.mean(timings) * 1000:.3f}  p50 {timings[len(timings) // 2] * 1000:.3f}  "
+        f"p95 {timings[int(len(timings) * 0.95)] * 1000:.3f}  max {timings[-1] * 1000:.3f}"
+    )
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for _ in range(args.iterations):
+            await refresh(client, args.initialize)
+        profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats(args.sort).print_stats(args.top)
+        print(f"\ncProfile, sorted by {args.sort}")
+        print(output.getvalue())
+
+    # Objects still alive after one refresh that did not exist before it. The
+    # list of existing objects keeps them alive, so ids are not reused.
+    gc.collect()
+    gc.disable()
+    try:
+        existing = gc.get_objects()
+        existing_ids = {id(item) for item in existing}
+        await refresh(client, args.initialize)
+        retained = [item for item in gc.get_objects() if id(item) not in existing_ids]
+        retained_types = Counter(
+            type(item).__qualname__ for item in retained if item is not existing and item is not existing_ids
+        )
+    finally:
+        del existing, existing_ids
+        gc.enable()
+    print(f"Objects retained per refresh: {sum(retained_types.values())}")
+    for name, count in retained_types.most_common(args.top):
+        print(f"  {count:8d}  {name}")
+
+    if args.trace:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        for _ in range(args.iterations):
+            await refresh(client, args.initialize)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"\ntracemalloc, peak {peak / 1024:.1f} KiB over {args.iterations} refreshes")
+        for stat in after.compare_to(before, "lineno")[: args.top]:
+            print(f"  {stat}")
+
+    await client.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the bench command line."""
+    parser = argparse.ArgumentParser(prog="python -m pyweatherflowrest.bench", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="store live responses for a station")
+    record_parser.add_argument("station_id", type=int)
+    record_parser.add_argument("token")
+    record_parser.add_argument("directory")
+
+    replay_parser = commands.add_parser("replay", help="profile the client on stored responses")
+    replay_parser.add_argument("directory")
+    replay_parser.add_argument("--iterations", type=int, default=100)
+    replay_parser.add_argument("--homeassistant", action="store_true")
+    replay_parser.add_argument("--initialize", action="store_true", help="run initialize in every refresh")
+    replay_parser.add_argument("--top", type=int, default=15, help="number of rows in each summary")
+    replay_parser.add_argument("--sort", default="cumulative", help="cProfile sort key")
+    replay_parser.add_argument("--no-profile", dest="profile", action="store_false")
+    replay_parser.add_argument("--no-trace", dest="trace", action="store_false")
+
+    for command in (record_parser, replay_parser):
+        command.add_argument("--units", default="metric", choices=("metric", "imperial"))
+        command.add_argument("--forecast-hours", type=int, default=48)
+
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(record(args) if args.command == "record" else replay(args))
+    except WeatherFlowError as err:
+        print(f"Error: {err}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
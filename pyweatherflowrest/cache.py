@@ -0,0 +1,122 @@
+"""Shared cache of processed data for clients watching the same station."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from pyweatherflowrest.const import DEFAULT_AUTHORIZATION_TTL, DEFAULT_CACHE_TTL
+
+# Result given to waiters when the fetch they share is cancelled.
+_RETRY = object()
+
+
+class SharedCache:
+    """Cache observations and forecasts across WeatherFlowApiClient instances.
+
+    Entries are keyed on station, data kind and the settings that change the
+    result, such as the unit system. Concurrent requests for the same key
+    share a single upstream fetch and conversion. A client only receives
+    cached data when its own token has been validated for the station within
+    authorization_ttl seconds. Otherwise it does its own fetch, which
+    validates the token. Clients subscribe to a station, and the station's
+    entries are dropped when the last subscriber leaves.
+    """
+
+    _instance: SharedCache = None
+
+    def __init__(self, ttl: dict = None, authorization_ttl: int = DEFAULT_AUTHORIZATION_TTL) -> None:
+        """Initialize the cache."""
+        self.ttl = dict(DEFAULT_CACHE_TTL)
+        if ttl is not None:
+            self.ttl.update(ttl)
+        self.authorization_ttl = authorization_ttl
+        self._entries: dict = {}
+        self._inflight: dict = {}
+        self._subscribers: dict = {}
+        self._authorized: dict = {}
+
+    @classmethod
+    def instance(cls) -> SharedCache:
+        """Return the process wide cache."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def subscribe(self, station_id: int) -> None:
+        """Register a client watching the station."""
+        self._subscribers[station_id] = self._subscribers.get(station_id, 0) + 1
+
+    def unsubscribe(self, station_id: int) -> None:
+        """Unregister a client and drop the station's data if it was the last one."""
+        count = self._subscribers.get(station_id, 0) - 1
+        if count > 0:
+            self._subscribers[station_id] = count
+            return
+        self._subscribers.pop(station_id, None)
+        for key in [key for key in self._entries if key[1] == station_id]:
+            del self._entries[key]
+        for key in [key for key in self._authorized if key[0] == station_id]:
+            del self._authorized[key]
+
+    def subscribers(self, station_id: int) -> int:
+        """Return the number of clients watching the station."""
+        return self._subscribers.get(station_id, 0)
+
+    def authorize(self, station_id: int, api_token: str) -> None:
+        """Mark a token as valid for the station."""
+        self._authorized[(station_id, api_token)] = time.monotonic() + self.authorization_ttl
+
+    def is_authorized(self, station_id: int, api_token: str) -> bool:
+        """Return True if the token has recently been validated for the station."""
+        expires = self._authorized.get((station_id, api_token))
+        return expires is not None and time.monotonic() < expires
+
+    async def get(self, key: tuple, api_token: str, fetch):
+        """Return cached data for key, fetching it with fetch() if needed.
+
+        key must start with the data kind followed by the station id. When
+        the shared fetch is cancelled, the clients waiting on it are not
+        cancelled with it, and the next one starts a new fetch.
+        """
+        kind, station_id = key[0], key[1]
+        if not self.is_authorized(station_id, api_token):
+            entity_data = await fetch()
+            self.authorize(station_id, api_token)
+            self._store(key, entity_data)
+            return entity_data
+
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl.get(kind, 0):
+                return entry[0]
+
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            entity_data = await asyncio.shield(future)
+            if entity_data is not _RETRY:
+                return entity_data
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entity_data = await fetch()
+        except Exception as err:
+            future.set_exception(err)
+            # Mark the exception as retrieved when nobody else waits on it.
+            future.exception()
+            raise
+        except BaseException:
+            future.set_result(_RETRY)
+            raise
+        else:
+            future.set_result(entity_data)
+            self._store(key, entity_data)
+            return entity_data
+        finally:
+            del self._inflight[key]
+
+    def _store(self, key: tuple, entity_data) -> None:
+        """Store data for a station that has subscribers."""
+        if entity_data is not None and self._subscribers.get(key[1]):
+            self._entries[key] = (entity_data, time.monotonic())
@@ -1,6 +1,8 @@
 """System Wide Constants for pyweatherflowrestapi."""
 from __future__ import annotations
 
+from pyweatherflowrest.data import DeviceTypeDescription
+
 BATTERY_MODE_DESCRIPTION = [
     "All sensors enabled and operating at full performance. Wind sampling interval every 3 seconds",
     "Wind sampling interval set to 6 seconds",
@@ -8,11 +10,82 @@ BATTERY_MODE_DESCRIPTION = [
     "Wind sampling interval set to 5 minutes. All other sensors sampling interval set to 5 minutes. Haptic Rain sensor disabled from active listening",
 ]
 
+# Seconds between observations reported by a Tempest in each battery mode.
+BATTERY_MODE_SAMPLE_INTERVAL = [60, 60, 60, 300]
+
+DEFAULT_AUTHORIZATION_TTL = 3600
+DEFAULT_CACHE_TTL = {"observations": 60, "forecast": 900}
+DEFAULT_DNS_CACHE_TTL = 300
+DEFAULT_FLEET_COLD_AFTER = 3600
+DEFAULT_FLEET_COLD_FORECAST_HOURS = 12
+DEFAULT_FLEET_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_HEDGE_BUDGET = 0.05
+DEFAULT_HEDGE_KINDS = ("observations", "device")
+DEFAULT_HEDGE_PERCENTILE = 95
+DEFAULT_KEEPALIVE_TIMEOUT = 60
+DEFAULT_LIMIT_PER_HOST = 10
+DEFAULT_MIN_POLL_INTERVAL = 30
+DEFAULT_MAX_POLL_INTERVAL = 900
+DEFAULT_REQUEST_TIMEOUT = 30
+# Seconds after which served data is older than a regular refresh would leave it.
+DEFAULT_STALE_AFTER = {"observations": 120, "forecast": 1800}
+
 DEVICE_TYPE_TEMPEST = "tempest"
 DEVICE_TYPE_AIR = "air"
 DEVICE_TYPE_SKY = "sky"
 DEVICE_TYPE_HUB = "hub"
 
+# Per device type: the index of the battery voltage in the device observation,
+# and the voltage range mapped linearly to 0-100% battery.
+DEVICE_TYPE_DESCRIPTIONS = {
+    DEVICE_TYPE_TEMPEST: DeviceTypeDescription(
+        device_type=DEVICE_TYPE_TEMPEST,
+        api_code="ST",
+        voltage_index=16,
+        battery_min_voltage=1.8,
+        battery_max_voltage=2.8,
+    ),
+    DEVICE_TYPE_AIR: DeviceTypeDescription(
+        device_type=DEVICE_TYPE_AIR,
+        api_code="AR",
+        voltage_index=6,
+        battery_min_voltage=2.4,
+        battery_max_voltage=3.5,
+    ),
+    DEVICE_TYPE_SKY: DeviceTypeDescription(
+        device_type=DEVICE_TYPE_SKY,
+        api_code="SK",
+        voltage_index=8,
+        battery_min_voltage=2.4,
+        battery_max_voltage=3.5,
+    ),
+}
+DEVICE_API_CODES = {item.api_code: item for item in DEVICE_TYPE_DESCRIPTIONS.values()}
+
+EVENT_GUST_THRESHOLD = "gust_threshold"
+EVENT_LIGHTNING_APPROACHING = "lightning_approaching"
+EVENT_LIGHTNING_RATE_INCREASING = "lightning_rate_increasing"
+EVENT_RAIN_START = "rain_start"
+EVENT_RAIN_STOP = "rain_stop"
+
+# Valid range and maximum change per minute of raw (metric) observation values.
+QUALITY_LIMITS = {
+    "air_temperature": (-60, 60, 3),
+    "dew_point": (-70, 40, 3),
+    "relative_humidity": (0, 100, 25),
+    "station_pressure": (500, 1100, 3),
+    "sea_level_pressure": (850, 1090, 3),
+    "barometric_pressure": (500, 1100, 3),
+    "wind_avg": (0, 75, 30),
+    "wind_gust": (0, 90, 40),
+    "wind_lull": (0, 75, 30),
+    "wind_direction": (0, 360, None),
+    "precip": (0, 10, None),
+    "solar_radiation": (0, 1800, None),
+    "uv": (0, 20, None),
+    "brightness": (0, 200000, None),
+}
+
 UNIT_TYPE_METRIC = "metric"
 UNIT_TYPE_IMPERIAL = "imperial"
 VALID_UNIT_TYPES = [UNIT_TYPE_IMPERIAL, UNIT_TYPE_METRIC]
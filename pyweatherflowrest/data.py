@@ -74,6 +74,8 @@ class ObservationDescription:
     station_name: str | None = None
     freezing_line: float | None = None
     cloud_base: float | None = None
+    is_stale: bool | None = None
+    data_age: float | None = None
 
 
 @dataclass
@@ -89,6 +91,7 @@ class StationDescription:
     longitude: float | None = None
     timezone: str | None = None
     elevation: int | None = None
+    max_visibility: float | None = None
     is_tempest: bool | None = False
     hub_device_id: int | None = None
     hub_device_type: str | None = None
@@ -97,6 +100,31 @@ class StationDescription:
     hub_serial_number: int | None = None
     device_list: list[DeviceDescription] = field(default_factory=list)
 
+    def __post_init__(self) -> None:
+        """Build the device registry from device_list."""
+        self._devices_by_id: dict[int, DeviceDescription] = {}
+        self._devices_by_type: dict[str, list[DeviceDescription]] = {}
+        for device in self.device_list:
+            self._register_device(device)
+
+    def _register_device(self, device: DeviceDescription) -> None:
+        """Add a device to the registry."""
+        self._devices_by_id[device.device_id] = device
+        self._devices_by_type.setdefault(device.device_type, []).append(device)
+
+    def add_device(self, device: DeviceDescription) -> None:
+        """Add a device to the station."""
+        self.device_list.append(device)
+        self._register_device(device)
+
+    def get_device(self, device_id: int) -> DeviceDescription | None:
+        """Return the device with the given id."""
+        return self._devices_by_id.get(device_id)
+
+    def devices_of_type(self, device_type: str) -> list[DeviceDescription]:
+        """Return all devices of the given type."""
+        return self._devices_by_type.get(device_type, [])
+
 @dataclass
 class DeviceDescription:
     """Class describing a Physical Device."""
@@ -107,6 +135,15 @@ class DeviceDescription:
     firmware_revision: int | None = None
     serial_number: int | None = None
 
+@dataclass(frozen=True)
+class DeviceTypeDescription:
+    """Class describing a type of Physical Device."""
+    device_type: str
+    api_code: str
+    voltage_index: int
+    battery_min_voltage: float
+    battery_max_voltage: float
+
 @dataclass
 class ForecastDailyDescription:
     """A class that describes Daily Forecast entities."""
@@ -182,6 +219,24 @@ class ForecastDescription:
     precip_minutes_local_yesterday: int | None = None
     forecast_daily: list[ForecastDailyDescription] = field(default_factory=list)
     forecast_hourly: list[ForecastHourlyDescription] = field(default_factory=list)
+    is_stale: bool | None = None
+    data_age: float | None = None
+
+    def __post_init__(self) -> None:
+        """Create the cache of resampled hourly forecasts."""
+        self._resampled: dict[int, list[ForecastHourlyDescription]] = {}
+
+    def resample(self, minutes: int) -> list[ForecastHourlyDescription]:
+        """Return the hourly forecast interpolated to steps of minutes.
+
+        The result is calculated once per forecast and interval.
+        """
+        resampled = self._resampled.get(minutes)
+        if resampled is None:
+            from pyweatherflowrest.forecast import resample_hourly
+
+            resampled = self._resampled[minutes] = resample_hourly(self.forecast_hourly, minutes)
+        return resampled
 
 @dataclass
 class BeaufortDescription:
@@ -189,3 +244,33 @@ class BeaufortDescription:
 
     value: int
     description: str
+
+@dataclass
+class SolarHourDescription:
+    """A class that describes the sun position for an hour."""
+
+    timestamp: int
+    elevation: float | None = None
+    clear_sky_radiation: float | None = None
+
+@dataclass
+class SolarDayDescription:
+    """A class that describes solar times for a local day."""
+
+    date: str
+    sunrise: int | None = None
+    sunset: int | None = None
+    solar_noon: int | None = None
+    day_length: int | None = None
+    hourly: list[SolarHourDescription] = field(default_factory=list)
+
+@dataclass
+class EventDescription:
+    """A class that describes a detected weather event."""
+
+    """This is the Key identifier for the station"""
+    key: int
+
+    event_type: str | None = None
+    timestamp: int | None = None
+    value: float | None = None
@@ -0,0 +1,146 @@
+"""Pre-rendered entity payloads for Home Assistant."""
+from __future__ import annotations
+
+from pyweatherflowrest.data import ForecastDescription, ObservationDescription
+
+# Observation fields and the key of their unit in the unit system dict.
+OBSERVATION_UNIT_TYPES = {
+    "air_temperature": "temperature",
+    "barometric_pressure": "pressure",
+    "station_pressure": "pressure",
+    "sea_level_pressure": "pressure",
+    "precip": "precipitation",
+    "precip_rate": "precipitation_rate",
+    "precip_accum_last_1hr": "precipitation",
+    "precip_accum_local_day": "precipitation",
+    "precip_accum_local_day_final": "precipitation",
+    "precip_accum_local_yesterday": "precipitation",
+    "precip_accum_local_yesterday_final": "precipitation",
+    "wind_avg": "length",
+    "wind_gust": "length",
+    "wind_lull": "length",
+    "lightning_strike_last_distance": "distance",
+    "feels_like": "temperature",
+    "heat_index": "temperature",
+    "wind_chill": "temperature",
+    "dew_point": "temperature",
+    "wet_bulb_temperature": "temperature",
+    "air_density": "density",
+    "visibility": "distance",
+    "cloud_base": "altitude",
+    "freezing_line": "altitude",
+}
+
+# Observation fields that have the same unit in every unit system.
+OBSERVATION_FIXED_UNITS = {
+    "relative_humidity": "%",
+    "absolute_humidity": "g/m³",
+    "precip_minutes_local_day": "min",
+    "precip_minutes_local_yesterday": "min",
+    "precip_minutes_local_yesterday_final": "min",
+    "wind_avg_kmh": "km/h",
+    "wind_gust_kmh": "km/h",
+    "wind_lull_kmh": "km/h",
+    "wind_avg_knots": "kn",
+    "wind_gust_knots": "kn",
+    "wind_lull_knots": "kn",
+    "wind_direction": "°",
+    "solar_radiation": "W/m²",
+    "brightness": "lx",
+    "delta_t": "°C",
+    "voltage_air": "V",
+    "voltage_sky": "V",
+    "voltage_tempest": "V",
+    "battery_air": "%",
+    "battery_sky": "%",
+    "battery_tempest": "%",
+}
+
+# Observation fields that are not exposed as entity states.
+OBSERVATION_EXCLUDED = ("key", "is_stale", "data_age")
+
+
+class EntityPayloads:
+    """Build entity states and forecast attributes from a single snapshot.
+
+    Payloads are cached and only rebuilt when a different observation or
+    forecast object is passed in.
+    """
+
+    def __init__(self, units: dict, homeassistant: bool = False, forecast_units: dict = None) -> None:
+        """Initialize the payload builder.
+
+        forecast_units holds the unit of each forecast attribute, as returned
+        by ForecastBuilder.attribute_units.
+        """
+        self.units = dict(units)
+        if homeassistant:
+            # Temperatures are not converted when Home Assistant does it.
+            self.units["temperature"] = "°C"
+        self.forecast_units = dict(forecast_units or {})
+        self._observation_fields = tuple(
+            name for name in ObservationDescription.__dataclass_fields__ if name not in OBSERVATION_EXCLUDED
+        )
+        self._observation_units = {
+            name: OBSERVATION_FIXED_UNITS.get(name, self.units.get(OBSERVATION_UNIT_TYPES.get(name)))
+            for name in self._observation_fields
+        }
+        self._observation_source = None
+        self._observation_states = None
+        self._forecast_source = None
+        self._forecast_attributes = None
+
+    def observation_states(self, observation: ObservationDescription) -> dict:
+        """Return a dict of field name to state and unit."""
+        if observation is None:
+            return None
+        if observation is not self._observation_source:
+            self._observation_states = {
+                name: {"state": getattr(observation, name), "unit": self._observation_units[name]}
+                for name in self._observation_fields
+            }
+            self._observation_source = observation
+        return self._observation_states
+
+    def forecast_attributes(self, forecast: ForecastDescription) -> dict:
+        """Return daily and hourly forecast lists with Home Assistant attribute names."""
+        if forecast is None:
+            return None
+        if forecast is not self._forecast_source:
+            self._forecast_attributes = {
+                "daily": [
+                    {
+                        "datetime": item.utc_time,
+                        "conditions": item.conditions,
+                        "icon": item.icon,
+                        "temperature": item.air_temp_high,
+                        "templow": item.air_temp_low,
+                        "precipitation": item.precip,
+                        "precipitation_probability": item.precip_probability,
+                        "wind_bearing": item.wind_direction,
+                        "wind_speed": item.wind_avg,
+                    }
+                    for item in forecast.forecast_daily
+                ],
+                "hourly": [
+                    {
+                        "datetime": item.utc_time,
+                        "conditions": item.conditions,
+                        "icon": item.icon,
+                        "temperature": item.air_temperature,
+                        "apparent_temperature": item.feels_like,
+                        "pressure": item.sea_level_pressure,
+                        "humidity": item.relative_humidity,
+                        "precipitation": item.precip,
+                        "precipitation_probability": item.precip_probability,
+                        "wind_bearing": item.wind_direction,
+                        "wind_speed": item.wind_avg,
+                        "wind_gust_speed": item.wind_gust,
+                        "uv_index": item.uv,
+                    }
+                    for item in forecast.forecast_hourly
+                ],
+                "units": self.forecast_units,
+            }
+            self._forecast_source = forecast
+        return self._forecast_attributes
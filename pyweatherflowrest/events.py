@@ -0,0 +1,156 @@
+"""Weather event detection for pyweatherflowrest."""
+from __future__ import annotations
+
+from pyweatherflowrest.const import (
+    EVENT_GUST_THRESHOLD,
+    EVENT_LIGHTNING_APPROACHING,
+    EVENT_LIGHTNING_RATE_INCREASING,
+    EVENT_RAIN_START,
+    EVENT_RAIN_STOP,
+)
+from pyweatherflowrest.data import EventDescription
+
+
+class EventDetector:
+    """Detect weather events from successive raw observations of one station.
+
+    Only a fixed number of values is kept between observations. All events
+    are debounced: rain must be seen on rain_start_samples observations in a
+    row to start and be absent for rain_stop_seconds to stop, lightning
+    events fire once and are re-armed when the trend reverses, and gust
+    thresholds are re-armed when the gust drops below the threshold times
+    gust_hysteresis.
+    """
+
+    def __init__(
+        self,
+        station_id: int,
+        rain_start_samples: int = 2,
+        rain_stop_seconds: int = 900,
+        strike_rate_factor: float = 1.5,
+        strike_rate_minimum: float = 1.0,
+        approach_strikes: int = 3,
+        gust_thresholds: tuple = (10.8, 17.2, 24.5),
+        gust_hysteresis: float = 0.8,
+    ) -> None:
+        """Initialize the detector."""
+        self.station_id = station_id
+        self.rain_start_samples = rain_start_samples
+        self.rain_stop_seconds = rain_stop_seconds
+        self.strike_rate_factor = strike_rate_factor
+        self.strike_rate_minimum = strike_rate_minimum
+        self.approach_strikes = approach_strikes
+        self.gust_thresholds = tuple(sorted(gust_thresholds))
+        self.gust_hysteresis = gust_hysteresis
+        self._listeners = []
+
+        self._last_timestamp = None
+        self._is_raining = False
+        self._wet_samples = 0
+        self._last_wet = None
+        self._strike_rate_fast = 0.0
+        self._strike_rate_slow = 0.0
+        self._strike_rate_increasing = False
+        self._last_strike_epoch = None
+        self._last_strike_distance = None
+        self._approaching_strikes = 0
+        self._approach_reported = False
+        self._gust_armed = [True] * len(self.gust_thresholds)
+
+    @property
+    def is_raining(self) -> bool:
+        """Return the debounced rain state."""
+        return self._is_raining
+
+    def add_listener(self, callback) -> None:
+        """Call callback with every detected event."""
+        self._listeners.append(callback)
+
+    def update(self, observation: dict) -> list[EventDescription]:
+        """Process a raw observation and return the events it caused."""
+        timestamp = observation.get("timestamp")
+        if timestamp is None or (self._last_timestamp is not None and timestamp <= self._last_timestamp):
+            return []
+        self._last_timestamp = timestamp
+
+        events = []
+        self._detect_rain(observation, timestamp, events)
+        self._detect_strike_rate(observation, timestamp, events)
+        self._detect_approaching(observation, timestamp, events)
+        self._detect_gusts(observation, timestamp, events)
+
+        for event in events:
+            for callback in self._listeners:
+                callback(event)
+        return events
+
+    def _event(self, event_type: str, timestamp: int, value) -> EventDescription:
+        """Return an event for this station."""
+        return EventDescription(key=self.station_id, event_type=event_type, timestamp=timestamp, value=value)
+
+    def _detect_rain(self, observation: dict, timestamp: int, events: list) -> None:
+        """Detect rain start and stop."""
+        precip = observation.get("precip")
+        if precip is None:
+            return
+
+        if precip > 0:
+            self._wet_samples += 1
+            self._last_wet = timestamp
+            if not self._is_raining and self._wet_samples >= self.rain_start_samples:
+                self._is_raining = True
+                events.append(self._event(EVENT_RAIN_START, timestamp, precip))
+            return
+
+        self._wet_samples = 0
+        if self._is_raining and timestamp - self._last_wet >= self.rain_stop_seconds:
+            self._is_raining = False
+            events.append(self._event(EVENT_RAIN_STOP, timestamp, precip))
+
+    def _detect_strike_rate(self, observation: dict, timestamp: int, events: list) -> None:
+        """Detect an increasing lightning strike rate with a fast and a slow moving average."""
+        count = observation.get("lightning_strike_count")
+        if count is None:
+            return
+
+        self._strike_rate_fast += 0.5 * (count - self._strike_rate_fast)
+        self._strike_rate_slow += 0.1 * (count - self._strike_rate_slow)
+        increasing = (
+            self._strike_rate_fast >= self.strike_rate_minimum
+            and self._strike_rate_fast > self._strike_rate_slow * self.strike_rate_factor
+        )
+        if increasing and not self._strike_rate_increasing:
+            events.append(self._event(EVENT_LIGHTNING_RATE_INCREASING, timestamp, round(self._strike_rate_fast, 2)))
+        self._strike_rate_increasing = increasing
+
+    def _detect_approaching(self, observation: dict, timestamp: int, events: list) -> None:
+        """Detect strikes getting closer over approach_strikes new strikes."""
+        epoch = observation.get("lightning_strike_last_epoch")
+        distance = observation.get("lightning_strike_last_distance")
+        if epoch is None or distance is None or epoch == self._last_strike_epoch:
+            return
+
+        if self._last_strike_distance is not None and distance < self._last_strike_distance:
+            self._approaching_strikes += 1
+        elif self._last_strike_distance is not None and distance > self._last_strike_distance:
+            self._approaching_strikes = 0
+            self._approach_reported = False
+        self._last_strike_epoch = epoch
+        self._last_strike_distance = distance
+
+        if not self._approach_reported and self._approaching_strikes >= self.approach_strikes - 1:
+            self._approach_reported = True
+            events.append(self._event(EVENT_LIGHTNING_APPROACHING, timestamp, distance))
+
+    def _detect_gusts(self, observation: dict, timestamp: int, events: list) -> None:
+        """Detect wind gusts crossing the configured thresholds."""
+        gust = observation.get("wind_gust")
+        if gust is None:
+            return
+
+        for index, threshold in enumerate(self.gust_thresholds):
+            if self._gust_armed[index] and gust >= threshold:
+                self._gust_armed[index] = False
+                events.append(self._event(EVENT_GUST_THRESHOLD, timestamp, threshold))
+            elif not self._gust_armed[index] and gust < threshold * self.gust_hysteresis:
+                self._gust_armed[index] = True
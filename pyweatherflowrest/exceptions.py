@@ -4,7 +4,18 @@ class WeatherFlowError(Exception):
 
 
 class ClientError(WeatherFlowError):
-    """Base Class for all other Unifi Protect client errors."""
+    """Base Class for all other Unifi Protect client errors.
+
+    The station, endpoint and HTTP status are attached when known, so
+    callers can classify errors without parsing the message.
+    """
+
+    def __init__(self, message: str = "", station_id=None, endpoint: str = None, status: int = None) -> None:
+        """Initialize the error."""
+        super().__init__(message)
+        self.station_id = station_id
+        self.endpoint = endpoint
+        self.status = status
 
 
 class BadRequest(ClientError):
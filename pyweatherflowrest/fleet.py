@@ -0,0 +1,253 @@
+"""Memory bounded state for clients in a fleet of stations."""
+from __future__ import annotations
+
+from dataclasses import replace
+import heapq
+import itertools
+import sys
+import time
+import zlib
+
+from pyweatherflowrest import snapshot
+from pyweatherflowrest.const import (
+    DEFAULT_FLEET_COLD_AFTER,
+    DEFAULT_FLEET_COLD_FORECAST_HOURS,
+    DEFAULT_FLEET_MAX_BYTES,
+)
+from pyweatherflowrest.data import ForecastDescription
+
+# Kinds of state that are dropped when packing is not enough. Station data is
+# needed to fetch anything else, so it is only ever packed.
+DROPPABLE_KINDS = ("observations", "forecast")
+
+_SCALAR_TYPES = {type(None), bool, int, float, str}
+
+
+def estimate_size(value) -> int:
+    """Return the approximate number of bytes held by a value.
+
+    Lists of dataclasses, such as the hourly forecast, are estimated from
+    their first item.
+    """
+    size = sys.getsizeof(value)
+    if hasattr(value, "__dataclass_fields__"):
+        attributes = value.__dict__
+        size += sys.getsizeof(attributes)
+        for item in attributes.values():
+            size += sys.getsizeof(item) if type(item) in _SCALAR_TYPES else estimate_size(item)
+    elif isinstance(value, (list, tuple)) and value:
+        if hasattr(value[0], "__dataclass_fields__"):
+            size += estimate_size(value[0]) * len(value)
+        else:
+            size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    return size
+
+
+class FleetState:
+    """Hold station, observation and forecast state within a memory budget.
+
+    Every client registers a slot and marks it read when its data is handed
+    to a consumer. Polling and the client's own state access do not count as
+    reads. When the estimated size of all slots goes above max_bytes, the
+    least recently read slots are reduced in steps until the state fits
+    again: the hourly forecast is cut to cold_forecast_hours, the state is
+    packed into compressed snapshots and finally observations and forecasts
+    are dropped. Packed state is unpacked when it is accessed again, and cut
+    or dropped state is fetched again by the client when it is read.
+
+    A slot that has not been read for cold_after seconds is cold, and its
+    client only builds cold_forecast_hours of hourly forecast. The
+    observation history each client keeps is not part of the budget, and is
+    bounded by the client's history_size instead.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_FLEET_MAX_BYTES,
+        cold_after: int = DEFAULT_FLEET_COLD_AFTER,
+        cold_forecast_hours: int = DEFAULT_FLEET_COLD_FORECAST_HOURS,
+    ) -> None:
+        """Initialize the fleet state."""
+        self.max_bytes = max_bytes
+        self.cold_after = cold_after
+        self.cold_forecast_hours = cold_forecast_hours
+        self.size = 0
+        self._slots: dict = {}
+        self._last_read: dict = {}
+        self._read_order: dict = {}
+        self._trimmed_forecasts: set = set()
+        self._counter = itertools.count()
+        self._reads = itertools.count()
+        # Per reduction step, the slots it can still be applied to and a heap
+        # of (read order, slot) to find the least recently read one. Heap
+        # entries whose read order is outdated are skipped.
+        self._reducible = {reduce: set() for reduce in (self._trim, self._pack, self._drop)}
+        self._queues = {reduce: [] for reduce in self._reducible}
+
+    def __len__(self) -> int:
+        """Return the number of registered slots."""
+        return len(self._slots)
+
+    def register(self, station_id: int) -> tuple:
+        """Return a new slot key for a client watching the station."""
+        key = (station_id, next(self._counter))
+        self._slots[key] = {}
+        self._last_read[key] = time.monotonic()
+        self._read_order[key] = next(self._reads)
+        self._mark_reducible(key)
+        return key
+
+    def release(self, key: tuple) -> None:
+        """Remove a slot and all its state."""
+        for entry in self._slots.pop(key, {}).values():
+            self.size -= entry[2]
+        self._last_read.pop(key, None)
+        self._read_order.pop(key, None)
+        self._trimmed_forecasts.discard(key)
+        for reducible in self._reducible.values():
+            reducible.discard(key)
+
+    def mark_read(self, key: tuple) -> None:
+        """Record that the slot's data was handed to a consumer."""
+        if key not in self._slots:
+            return
+        self._last_read[key] = time.monotonic()
+        self._read_order[key] = next(self._reads)
+        for reduce, reducible in self._reducible.items():
+            if key in reducible:
+                self._push(reduce, key)
+
+    def is_trimmed(self, key: tuple) -> bool:
+        """Return True if the slot's hourly forecast was cut to cold_forecast_hours."""
+        return key in self._trimmed_forecasts
+
+    def is_cold(self, key: tuple) -> bool:
+        """Return True if the slot has not been marked read for cold_after seconds."""
+        last_read = self._last_read.get(key)
+        return last_read is not None and time.monotonic() - last_read > self.cold_after
+
+    def forecast_hours(self, key: tuple, forecast_hours: int) -> int:
+        """Return the number of hourly forecast items to build for the slot."""
+        if self.is_cold(key):
+            return min(forecast_hours, self.cold_forecast_hours)
+        return forecast_hours
+
+    def get(self, key: tuple, kind: str):
+        """Return state for the slot, unpacking it if needed.
+
+        This does not count as a read, see mark_read.
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        entry = slot.get(kind)
+        if entry is None or not entry[1]:
+            return None if entry is None else entry[0]
+
+        value = snapshot.loads(zlib.decompress(entry[0]))
+        self._set_entry(slot, kind, value, False)
+        self._mark_reducible(key)
+        self._enforce_budget(key)
+        return value
+
+    def put(self, key: tuple, kind: str, value) -> None:
+        """Store state for the slot, or remove it when value is None."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return
+        if kind == "forecast":
+            self._trimmed_forecasts.discard(key)
+        if value is None:
+            entry = slot.pop(kind, None)
+            if entry is not None:
+                self.size -= entry[2]
+            return
+
+        if isinstance(value, ForecastDescription) and self.is_cold(key):
+            value = self._trimmed(value, key)
+        self._set_entry(slot, kind, value, False)
+        self._mark_reducible(key)
+        self._enforce_budget(key)
+
+    def _push(self, reduce, key: tuple) -> None:
+        """Queue the slot for a reduction step at its current read order."""
+        queue = self._queues[reduce]
+        reducible = self._reducible[reduce]
+        if len(queue) > 2 * len(reducible) + 64:
+            # Drop outdated entries before the heap grows without bound.
+            queue[:] = [(self._read_order[item], item) for item in reducible]
+            heapq.heapify(queue)
+        else:
+            heapq.heappush(queue, (self._read_order[key], key))
+
+    def _mark_reducible(self, key: tuple) -> None:
+        """Open the slot to every reduction step."""
+        for reduce, reducible in self._reducible.items():
+            if key not in reducible:
+                reducible.add(key)
+                self._push(reduce, key)
+
+    def _set_entry(self, slot: dict, kind: str, value, packed: bool) -> None:
+        """Replace an entry and update the total size."""
+        size = sys.getsizeof(value) if packed else estimate_size(value)
+        entry = slot.get(kind)
+        if entry is not None:
+            self.size -= entry[2]
+        slot[kind] = [value, packed, size]
+        self.size += size
+
+    def _trimmed(self, forecast: ForecastDescription, key: tuple) -> ForecastDescription:
+        """Return the forecast with the hourly items cut to cold_forecast_hours."""
+        if len(forecast.forecast_hourly) <= self.cold_forecast_hours:
+            return forecast
+        self._trimmed_forecasts.add(key)
+        return replace(forecast, forecast_hourly=forecast.forecast_hourly[: self.cold_forecast_hours])
+
+    def _trim(self, key: tuple) -> None:
+        """Cut the hourly forecast of a slot."""
+        slot = self._slots[key]
+        entry = slot.get("forecast")
+        if entry is not None and not entry[1]:
+            trimmed = self._trimmed(entry[0], key)
+            if trimmed is not entry[0]:
+                self._set_entry(slot, "forecast", trimmed, False)
+
+    def _pack(self, key: tuple) -> None:
+        """Pack all state of a slot into compressed snapshots."""
+        slot = self._slots[key]
+        for kind, entry in list(slot.items()):
+            if not entry[1]:
+                self._set_entry(slot, kind, zlib.compress(snapshot.dumps(entry[0])), True)
+
+    def _drop(self, key: tuple) -> None:
+        """Drop observations and forecasts of a slot."""
+        slot = self._slots[key]
+        self._trimmed_forecasts.discard(key)
+        for kind in DROPPABLE_KINDS:
+            entry = slot.pop(kind, None)
+            if entry is not None:
+                self.size -= entry[2]
+
+    def _enforce_budget(self, keep: tuple) -> None:
+        """Reduce the least recently read slots until the state fits max_bytes.
+
+        The slot in keep is the one being used and is never reduced.
+        """
+        for reduce, queue in self._queues.items():
+            reducible = self._reducible[reduce]
+            kept = None
+            while self.size > self.max_bytes and queue:
+                order, key = heapq.heappop(queue)
+                if key not in reducible or self._read_order[key] != order:
+                    continue
+                if key == keep:
+                    kept = (order, key)
+                    continue
+                reducible.discard(key)
+                reduce(key)
+            if kept is not None:
+                heapq.heappush(queue, kept)
+            if self.size <= self.max_bytes:
+                return
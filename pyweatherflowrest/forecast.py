@@ -0,0 +1,309 @@
+"""Forecast processing for pyweatherflowrest."""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+from typing import TYPE_CHECKING
+
+from pyweatherflowrest import snapshot
+from pyweatherflowrest.const import UNIT_TYPE_METRIC
+from pyweatherflowrest.data import (
+    ForecastDailyDescription,
+    ForecastDescription,
+    ForecastHourlyDescription,
+)
+from pyweatherflowrest.exceptions import NotAuthorized
+from pyweatherflowrest.helpers import FETCH_DRIFT, Calculations, Conversions, resilient_fetch
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+# Hourly forecast fields interpolated linearly when resampling, and the ones
+# rounded to whole numbers. precip is an hourly amount and is spread over the
+# steps of the hour, wind_direction is interpolated along the shortest arc and
+# the remaining fields are taken from the hour a step falls in.
+RESAMPLE_LINEAR_FIELDS = (
+    "air_temperature",
+    "sea_level_pressure",
+    "relative_humidity",
+    "precip_probability",
+    "wind_avg",
+    "wind_gust",
+    "uv",
+    "feels_like",
+)
+RESAMPLE_INTEGER_FIELDS = {"relative_humidity", "precip_probability"}
+
+
+class ForecastBuilder:
+    """Build a ForecastDescription from a better_forecast payload.
+
+    Only holds plain settings, so instances can be pickled and the work can be
+    done in a worker process.
+    """
+
+    def __init__(
+        self,
+        station_id: int,
+        units: str,
+        homeassistant: bool,
+        forecast_hours: int,
+        forecast_days: int | None = None,
+        ignore_fetch_errors: bool = True,
+    ) -> None:
+        """Initialize the builder."""
+        self.station_id = station_id
+        self.homeassistant = homeassistant
+        self.forecast_hours = forecast_hours
+        self.forecast_days = forecast_days
+        self.ignore_fetch_errors = ignore_fetch_errors
+        self._pid = os.getpid()
+        self.cnv = Conversions(units, homeassistant)
+        self.calc = Calculations()
+
+    def attribute_units(self) -> dict:
+        """Return the unit of each forecast attribute as converted by build.
+
+        Temperatures are left in Celsius for Home Assistant, except the hourly
+        feels_like, and wind speeds are km/h for Home Assistant in metric.
+        """
+        is_metric = self.cnv.units == UNIT_TYPE_METRIC
+        temperature_unit = "°C" if is_metric or self.homeassistant else "°F"
+        if is_metric:
+            wind_unit = "km/h" if self.homeassistant else "m/s"
+        else:
+            wind_unit = "mph"
+        return {
+            "temperature": temperature_unit,
+            "templow": temperature_unit,
+            "apparent_temperature": "°C" if is_metric else "°F",
+            "pressure": "hPa" if is_metric else "inHg",
+            "precipitation": "mm" if is_metric else "in",
+            "wind_speed": wind_unit,
+            "wind_gust_speed": wind_unit,
+        }
+
+    def decode_and_build(self, raw: bytes, endpoint: str = None) -> tuple[ForecastDescription | bytes, dict]:
+        """Decode a raw JSON response and build the forecast.
+
+        Returns the forecast and the keys found missing while building it with
+        their counts. In a worker process the forecast is returned as a
+        snapshot, which for a 240 hour forecast loads in about half the time
+        of the pickle the pool would otherwise send. Misses are also only
+        returned from a worker process, whose own FETCH_DRIFT is never
+        reported, so the caller can add them to its counter. endpoint is
+        attached to the errors raised.
+        """
+        in_worker = os.getpid() != self._pid
+        before = dict(FETCH_DRIFT.counts) if in_worker else None
+        data = json.loads(raw)
+        if data.get("status") is not None:
+            if data["status"]["status_code"] == 401:
+                raise NotAuthorized(
+                    "The Token supplied is not valid for the Station ID. Cannot continue.",
+                    station_id=self.station_id,
+                    endpoint=endpoint,
+                    status=401,
+                )
+        entity_data = self.build(data)
+        if not in_worker:
+            return entity_data, {}
+        drift = {
+            key: count - before.get(key, 0)
+            for key, count in FETCH_DRIFT.counts.items()
+            if count > before.get(key, 0)
+        }
+        return snapshot.dumps(entity_data), drift
+
+    def build(self, data: dict) -> ForecastDescription:
+        """Return forecast data from a decoded better_forecast payload."""
+        current: dict = data['current_conditions']
+        entity_data = ForecastDescription(
+            key=self.station_id,
+            utc_time=self.cnv.utc_from_timestamp(current.get("time")),
+            conditions=current.get("conditions"),
+            icon=current.get("icon"),
+            air_temperature=self.cnv.temperature(current.get("air_temperature")),
+            station_pressure=self.cnv.pressure(current.get("station_pressure")),
+            sea_level_pressure=self.cnv.pressure(current.get("sea_level_pressure")),
+            pressure_trend=current.get("pressure_trend"),
+            relative_humidity=current.get("relative_humidity"),
+            wind_avg=self.cnv.windspeed(current.get("wind_avg"), self.homeassistant),
+            wind_direction=current.get("wind_direction"),
+            wind_direction_cardinal=current.get("wind_direction_cardinal"),
+            wind_gust=self.cnv.windspeed(current.get("wind_gust"), self.homeassistant),
+            solar_radiation=current.get("solar_radiation"),
+            uv=current.get("uv"),
+            brightness=current.get("brightness"),
+            feels_like=self.cnv.temperature(current.get("feels_like")),
+            dew_point=self.cnv.temperature(current.get("dew_point")),
+            wet_bulb_temperature=self.cnv.temperature(current.get("wet_bulb_temperature")),
+            delta_t=current.get("delta_t"),
+            air_density=self.cnv.density(current.get("air_density")),
+            lightning_strike_count_last_1hr=current.get("lightning_strike_count_last_1hr"),
+            lightning_strike_count_last_3hr=current.get("lightning_strike_count_last_3hr"),
+            lightning_strike_last_distance=current.get("lightning_strike_last_distance"),
+            lightning_strike_last_distance_msg=current.get("lightning_strike_last_distance_msg"),
+            lightning_strike_last_epoch=self.cnv.utc_from_timestamp_to_date(
+                current.get("lightning_strike_last_epoch")
+            ),
+            precip_accum_local_day=self.cnv.rain(current.get("precip_accum_local_day")),
+            precip_accum_local_yesterday=self.cnv.rain(current.get("precip_accum_local_yesterday")),
+            precip_minutes_local_day=current.get("precip_minutes_local_day"),
+            precip_minutes_local_yesterday=current.get("precip_minutes_local_yesterday"),
+        )
+
+        forecast_daily = data["forecast"]["daily"]
+        if self.forecast_days is not None:
+            forecast_daily = forecast_daily[: self.forecast_days]
+
+        entity_data.temp_high_today = forecast_daily[0]["air_temp_high"]
+        entity_data.temp_low_today = forecast_daily[0]["air_temp_low"]
+
+        hourly_by_day = self.calc.hourly_by_day(
+            data["forecast"]["hourly"], {item["day_num"] for item in forecast_daily}
+        )
+        for item in forecast_daily:
+            calc_values = self.calc.day_forecast_extras(item, hourly_by_day.get(item["day_num"], []))
+            if calc_values is not None:
+                day_item = ForecastDailyDescription(
+                    utc_time=self.cnv.utc_from_timestamp(item["day_start_local"]),
+                    conditions=item["conditions"],
+                    icon="cloudy" if item.get("icon") is None else item.get("icon"),
+                    sunrise=item["sunrise"],
+                    sunset=item["sunset"],
+                    air_temp_high=self.cnv.temperature(item["air_temp_high"]),
+                    air_temp_low=self.cnv.temperature(item["air_temp_low"]),
+                    precip=self.cnv.rain(calc_values["precip"]),
+                    precip_probability=item["precip_probability"],
+                    wind_avg=self.cnv.windspeed(calc_values["wind_avg"], self.homeassistant),
+                    wind_direction=calc_values["wind_direction"],
+                )
+                entity_data.forecast_daily.append(day_item)
+
+        entity_data.forecast_hourly.extend(self.iter_hourly(data))
+
+        return entity_data
+
+    def iter_hourly(self, data: dict):
+        """Yield converted hourly forecast items up to forecast_hours."""
+        for item in data["forecast"]["hourly"][: self.forecast_hours]:
+            yield self.hourly_item(item)
+
+    def hourly_item(self, item: dict) -> ForecastHourlyDescription:
+        """Return a single converted hourly forecast item."""
+        return ForecastHourlyDescription(
+            utc_time=self.cnv.utc_from_timestamp(item["time"]),
+            conditions=resilient_fetch(item, "conditions", "Data Error", self.ignore_fetch_errors),
+            icon="cloudy" if item.get("icon") is None else item.get("icon"),
+            air_temperature=self.cnv.temperature(resilient_fetch(item, "air_temperature", 20.0, self.ignore_fetch_errors)),
+            sea_level_pressure=self.cnv.pressure(resilient_fetch(item, "sea_level_pressure", 0, self.ignore_fetch_errors)),
+            relative_humidity=resilient_fetch(item, "relative_humidity", 0, self.ignore_fetch_errors),
+            precip=self.cnv.rain(resilient_fetch(item, "precip", 0, self.ignore_fetch_errors)),
+            precip_probability=resilient_fetch(item, "precip_probability", 0, self.ignore_fetch_errors),
+            wind_avg=self.cnv.windspeed(resilient_fetch(item, "wind_avg", 0, self.ignore_fetch_errors), self.homeassistant),
+            wind_direction=resilient_fetch(item, "wind_direction", 0, self.ignore_fetch_errors),
+            wind_direction_cardinal=resilient_fetch(item, "wind_direction_cardinal", "N", self.ignore_fetch_errors),
+            wind_gust=self.cnv.windspeed(resilient_fetch(item, "wind_gust", 0.0, self.ignore_fetch_errors), self.homeassistant),
+            uv=resilient_fetch(item, "uv", 0, self.ignore_fetch_errors),
+            feels_like=self.cnv.temperature(resilient_fetch(item, "feels_like", 20.0, self.ignore_fetch_errors), True),
+        )
+
+
+def create_executor(max_workers: int | None = None, use_processes: bool = True) -> Executor:
+    """Return an executor that can be passed to WeatherFlowApiClient.
+
+    A process pool uses all cores for decoding and conversion, a thread pool
+    only moves the work off the event loop thread.
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if use_processes:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def resample_hourly(forecast_hourly: list[ForecastHourlyDescription], minutes: int) -> list[ForecastHourlyDescription]:
+    """Return hourly forecast items interpolated to steps of minutes.
+
+    Each field is interpolated as a column over all steps, and the last hourly
+    item ends the series.
+    """
+    if not isinstance(minutes, int) or not 0 < minutes <= 60:
+        raise ValueError(f"Invalid resample interval: {minutes}")
+
+    rows = [item for item in forecast_hourly if item.utc_time is not None]
+    if not rows:
+        return []
+    times = [int(dt.datetime.fromisoformat(item.utc_time).timestamp()) for item in rows]
+    step = minutes * 60
+
+    # Per output step: index of the hourly item it falls in, the fraction of
+    # the way to the next item and the share of the hour it covers.
+    index = []
+    fraction = []
+    share = []
+    timestamps = []
+    for pos in range(len(rows) - 1):
+        start, span = times[pos], times[pos + 1] - times[pos]
+        for offset in range(0, span, step):
+            index.append(pos)
+            fraction.append(offset / span)
+            share.append(min(step, span - offset) / span)
+            timestamps.append(start + offset)
+    index.append(len(rows) - 1)
+    fraction.append(0.0)
+    share.append(step / 3600)
+    timestamps.append(times[-1])
+
+    columns = {}
+    for name in RESAMPLE_LINEAR_FIELDS:
+        values = [getattr(item, name) for item in rows]
+        values.append(values[-1])
+        columns[name] = [
+            None if values[pos] is None or values[pos + 1] is None
+            else values[pos] + (values[pos + 1] - values[pos]) * frac
+            for pos, frac in zip(index, fraction)
+        ]
+
+    precip = [item.precip for item in rows]
+    columns["precip"] = [None if precip[pos] is None else precip[pos] * part for pos, part in zip(index, share)]
+
+    for name, values in columns.items():
+        digits = None if name in RESAMPLE_INTEGER_FIELDS else 3
+        columns[name] = [None if value is None else round(value, digits) for value in values]
+
+    directions = [item.wind_direction for item in rows]
+    directions.append(directions[-1])
+    columns["wind_direction"] = [
+        None if directions[pos] is None or directions[pos + 1] is None
+        else round(directions[pos] + ((directions[pos + 1] - directions[pos] + 540) % 360 - 180) * frac) % 360
+        for pos, frac in zip(index, fraction)
+    ]
+    # WeatherFlow gives cardinal directions in upper case.
+    calc = Calculations()
+    columns["wind_direction_cardinal"] = [
+        rows[index[pos]].wind_direction_cardinal if direction is None else calc.wind_direction(direction).upper()
+        for pos, direction in enumerate(columns["wind_direction"])
+    ]
+
+    return [
+        ForecastHourlyDescription(
+            utc_time=dt.datetime.fromtimestamp(timestamps[pos], dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+            conditions=rows[index[pos]].conditions,
+            icon=rows[index[pos]].icon,
+            air_temperature=columns["air_temperature"][pos],
+            sea_level_pressure=columns["sea_level_pressure"][pos],
+            relative_humidity=columns["relative_humidity"][pos],
+            precip=columns["precip"][pos],
+            precip_probability=columns["precip_probability"][pos],
+            wind_avg=columns["wind_avg"][pos],
+            wind_direction=columns["wind_direction"][pos],
+            wind_direction_cardinal=columns["wind_direction_cardinal"][pos],
+            wind_gust=columns["wind_gust"][pos],
+            uv=columns["uv"][pos],
+            feels_like=columns["feels_like"][pos],
+        )
+        for pos in range(len(timestamps))
+    ]
@@ -0,0 +1,70 @@
+"""Hedged requests for pyweatherflowrest."""
+from __future__ import annotations
+
+from collections import deque
+
+from pyweatherflowrest.const import DEFAULT_HEDGE_BUDGET, DEFAULT_HEDGE_KINDS, DEFAULT_HEDGE_PERCENTILE
+
+
+class RequestHedging:
+    """Decide when a duplicate request is sent for a slow response.
+
+    Latencies are kept per kind of request. When a request has taken longer
+    than the given percentile of the recent latencies, a second identical
+    request is sent and the first response is used. Every request adds budget
+    to a token bucket and every hedge takes a whole token, so hedges are at
+    most a budget fraction of all requests.
+    """
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        budget: float = DEFAULT_HEDGE_BUDGET,
+        kinds: tuple = DEFAULT_HEDGE_KINDS,
+        window: int = 100,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+        max_tokens: float = 10,
+    ) -> None:
+        """Initialize the hedging policy."""
+        self.percentile = percentile
+        self.budget = budget
+        self.kinds = tuple(kinds)
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_tokens = max_tokens
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._tokens = 0.0
+        self._latencies: dict = {}
+
+    def record(self, kind: str, latency: float) -> None:
+        """Add the latency of a completed request."""
+        latencies = self._latencies.get(kind)
+        if latencies is None:
+            latencies = self._latencies[kind] = deque(maxlen=self.window)
+        latencies.append(latency)
+
+    def delay(self, kind: str) -> float | None:
+        """Return seconds to wait before hedging, or None without enough samples."""
+        latencies = self._latencies.get(kind)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay, ordered[index])
+
+    def add_request(self) -> None:
+        """Count a request and add its share of the hedge budget."""
+        self.requests += 1
+        self._tokens = min(self.max_tokens, self._tokens + self.budget)
+
+    def try_hedge(self) -> bool:
+        """Return True and take a token if the budget allows a hedge."""
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self.hedges += 1
+        return True
@@ -2,16 +2,112 @@
 from __future__ import annotations
 
 import datetime as dt
+from functools import lru_cache
 import logging
 import math
+import time
 
 from pyweatherflowrest.const import BATTERY_MODE_DESCRIPTION, UNIT_TYPE_METRIC
-from pyweatherflowrest.data import BeaufortDescription
+from pyweatherflowrest.data import BeaufortDescription, DeviceTypeDescription
 
 UTC = dt.timezone.utc
 
 _LOGGER = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=4096)
+def saturation_factor(air_temperature: float) -> float:
+    """Return the temperature driven term of the absolute humidity formula.
+
+    Observations are reported with a resolution of 0.1 degree, so the number
+    of distinct inputs is small and the results are memoized.
+    """
+    temperature_kelvin = air_temperature + 273.16
+    return (1320.65 / temperature_kelvin) * (
+        10 ** ((7.4475 * (temperature_kelvin - 273.14)) / (temperature_kelvin - 39.44))
+    )
+
+
+# UpDryTwist, 2023-08-29:  This should be set in some better way, but didn't want to do too much reengineering
+#                          of this class and the two places it's called.  This isn't very convenient to patch
+#                          where it is here!
+
+
+class FetchDriftCounter:
+    """Count keys missing from WeatherFlow payloads.
+
+    The first miss of a key is logged, after that misses are only counted
+    and a summary is logged at most once per report_interval seconds.
+    """
+
+    def __init__(self, report_interval: int = 900) -> None:
+        """Initialize the counter."""
+        self.report_interval = report_interval
+        self.counts: dict = {}
+        self._unreported: dict = {}
+        self._last_report = time.monotonic()
+
+    def missing(self, key, level: int, fetch_from) -> None:
+        """Register a missing key."""
+        first = key not in self.counts
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if first:
+            _LOGGER.log(
+                level,
+                "The key %s is missing from the WeatherFlow data. It is likely that the WeatherFlow API has "
+                "changed unexpectedly. Further misses are counted and reported every %s seconds.",
+                key,
+                self.report_interval,
+            )
+            if fetch_from is not None and _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("Data with missing key %s: %s", key, fetch_from)
+            return
+
+        self._unreported[key] = self._unreported.get(key, 0) + 1
+        now = time.monotonic()
+        if now - self._last_report >= self.report_interval:
+            _LOGGER.log(level, "Keys missing from WeatherFlow data since last report: %s", self._unreported)
+            self._unreported = {}
+            self._last_report = now
+
+    def add(self, counts: dict, level: int) -> None:
+        """Register misses counted elsewhere, such as in a worker process."""
+        for key, count in counts.items():
+            for _ in range(count):
+                self.missing(key, level, None)
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        self.counts = {}
+        self._unreported = {}
+
+
+FETCH_DRIFT = FetchDriftCounter()
+
+
+def resilient_fetch (fetch_from, key, default, ignore_errors=False ):
+    """
+    This can be used to fetch a value out of a suspect return, such as the JSON return from Weatherflow,
+    which as demonstrated on 2023-08-28 may change at some future date.  By default, this is going to
+    error out if the value's not there, but it will log what it's looking for, and you can set a flag
+    to have it ignore the missing value and keep going.
+
+    Provide an array or dictionary to read from in fetch_from, and the key to use.  The default will
+    be returned if we've set IGNORE_FETCH_ERRORS, otherwise, we're going to throw a KeyError.
+    Missing keys are counted in FETCH_DRIFT instead of being logged one by one.
+    """
+    if key in fetch_from:
+        return fetch_from[key]
+    else:
+        FETCH_DRIFT.missing(key, logging.INFO if ignore_errors else logging.WARNING, fetch_from)
+        if ignore_errors:
+            return default
+        else:
+            if FETCH_DRIFT.counts[key] == 1:
+                _LOGGER.warning("You can set the value IGNORE_FETCH_ERRORS in the Config Menu of the WeatherFlow Integration.")
+            raise KeyError(key)
+
+
 class Conversions:
     """Convert values from metric."""
 
@@ -155,6 +251,21 @@ class Calculations:
             return False
         return count > 0
 
+    def hourly_by_day(self, hour_data, day_nums) -> dict:
+        """Return hourly forecast items grouped by local_day.
+
+        Hourly items are ordered by time, so grouping stops at the first item
+        outside day_nums once the requested days have been reached.
+        """
+        _days = {}
+        for item in hour_data:
+            if item["local_day"] not in day_nums:
+                if _days:
+                    break
+                continue
+            _days.setdefault(item["local_day"], []).append(item)
+        return _days
+
     def day_forecast_extras(self, day_data, hour_data) -> float:
         """Return accumulated precip for the day."""
         _precip = 0
@@ -167,6 +278,9 @@ class Calculations:
                 _wind_avg.append(item["wind_avg"])
                 _wind_bearing.append(item["wind_direction"])
 
+        if not _wind_avg:
+            return None
+
         _sum_wind_avg = sum(_wind_avg) / len(_wind_avg)
         _sum_wind_bearing = sum(_wind_bearing) / len(_wind_bearing)
 
@@ -190,16 +304,28 @@ class Calculations:
         freeze_line = (192 * air_temperature) + elevation
         return 0 if freeze_line < 0 else freeze_line
 
-    def visibility(self, elevation, air_temperature, relative_humidity, dewpoint) -> float:
-        """Return the calculated visibility."""
-        if elevation is None or air_temperature is None or relative_humidity is None or dewpoint is None:
+    def max_visibility(self, elevation) -> float:
+        """Return the maximum visibility in km for a given elevation."""
+        if elevation is None:
             return None
 
         elevation_min = float(2)
         if elevation > 2:
             elevation_min = float(elevation)
 
-        max_visibility = float(3.56972 * math.sqrt(elevation_min))
+        return float(3.56972 * math.sqrt(elevation_min))
+
+    def visibility(self, elevation, air_temperature, relative_humidity, dewpoint, max_visibility=None) -> float:
+        """Return the calculated visibility.
+
+        max_visibility can be supplied from the StationDescription to avoid
+        recalculating the elevation dependant part on every observation.
+        """
+        if elevation is None or air_temperature is None or relative_humidity is None or dewpoint is None:
+            return None
+
+        if max_visibility is None:
+            max_visibility = self.max_visibility(elevation)
         percent_reduction_a = float((1.13 * abs(air_temperature - dewpoint) - 1.15) / 10)
         if percent_reduction_a > 1:
             percent_reduction = float(1)
@@ -216,9 +342,8 @@ class Calculations:
         if air_temperature is None or relative_humidity is None:
             return None
 
-        temperature_kelvin = air_temperature + 273.16
         humidity = relative_humidity / 100
-        abs_humidity = (1320.65 / temperature_kelvin) * humidity * (10 ** ((7.4475 * (temperature_kelvin - 273.14)) / (temperature_kelvin - 39.44)))
+        abs_humidity = saturation_factor(air_temperature) * humidity
 
         return round(abs_humidity, 2)
 
@@ -244,6 +369,21 @@ class Calculations:
 
         return int(bat_percent)
 
+    def device_battery_percent(self, type_description: DeviceTypeDescription, voltage: float) -> int:
+        """Return battery percentage from voltage using the battery curve of the device type."""
+        if type_description is None or voltage is None:
+            return None
+
+        if voltage > type_description.battery_max_voltage:
+            bat_percent = 100
+        elif voltage < type_description.battery_min_voltage:
+            bat_percent = 0
+        else:
+            voltage_span = round(type_description.battery_max_voltage - type_description.battery_min_voltage, 3)
+            bat_percent = ((voltage - type_description.battery_min_voltage) / voltage_span) * 100
+
+        return int(bat_percent)
+
     def uv_description(self, uv: float) -> str:
         """Return a Description based on uv value."""
         if uv is None:
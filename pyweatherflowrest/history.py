@@ -0,0 +1,187 @@
+"""Rolling observation history for pyweatherflowrest."""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+
+HISTORY_FIELDS = (
+    "air_temperature",
+    "relative_humidity",
+    "station_pressure",
+    "sea_level_pressure",
+    "precip",
+    "wind_avg",
+    "wind_gust",
+    "wind_lull",
+    "solar_radiation",
+    "lightning_strike_count",
+)
+
+
+class RollingWindow:
+    """Bounded ring buffer of timestamped values with O(1) aggregates.
+
+    Values are kept in typed arrays that grow until max_samples is reached
+    and are then reused as a ring. Min and max are tracked with monotonic
+    deques, sum and mean with a running total.
+    """
+
+    def __init__(self, max_samples: int, retention: int) -> None:
+        """Initialize the window."""
+        self.max_samples = max(1, int(max_samples))
+        self.retention = retention
+        self._timestamps = array("q")
+        self._values = array("d")
+        self._start = 0
+        self._count = 0
+        self._seq = 0
+        self._sum = 0.0
+        self._min: deque[int] = deque()
+        self._max: deque[int] = deque()
+
+    def __len__(self) -> int:
+        """Return number of samples in the window."""
+        return self._count
+
+    def _value_at(self, seq: int) -> float:
+        """Return the value stored for an absolute sequence number."""
+        return self._values[seq % self.max_samples]
+
+    def _evict_oldest(self) -> None:
+        """Remove the oldest sample from the window."""
+        oldest_seq = self._seq - self._count
+        self._sum -= self._values[self._start]
+        if self._min and self._min[0] == oldest_seq:
+            self._min.popleft()
+        if self._max and self._max[0] == oldest_seq:
+            self._max.popleft()
+        self._start = (self._start + 1) % self.max_samples
+        self._count -= 1
+        if self._count == 0:
+            self._sum = 0.0
+
+    def expire(self, now: int) -> None:
+        """Drop samples older than the retention period."""
+        if self.retention is None:
+            return
+        cutoff = now - self.retention
+        while self._count and self._timestamps[self._start] < cutoff:
+            self._evict_oldest()
+
+    def append(self, timestamp: int, value: float) -> None:
+        """Add a sample, ignoring samples that are not newer than the latest."""
+        if self._count and timestamp <= self.latest_timestamp:
+            return
+        if self._count == self.max_samples:
+            self._evict_oldest()
+
+        pos = self._seq % self.max_samples
+        if pos == len(self._values):
+            self._timestamps.append(timestamp)
+            self._values.append(value)
+        else:
+            self._timestamps[pos] = timestamp
+            self._values[pos] = value
+
+        while self._min and self._value_at(self._min[-1]) >= value:
+            self._min.pop()
+        self._min.append(self._seq)
+        while self._max and self._value_at(self._max[-1]) <= value:
+            self._max.pop()
+        self._max.append(self._seq)
+
+        self._sum += value
+        self._count += 1
+        self._seq += 1
+        self.expire(timestamp)
+
+    @property
+    def latest_timestamp(self) -> int:
+        """Return timestamp of the newest sample."""
+        if not self._count:
+            return None
+        return self._timestamps[(self._seq - 1) % self.max_samples]
+
+    @property
+    def first(self) -> float:
+        """Return the oldest value in the window."""
+        if not self._count:
+            return None
+        return self._values[self._start]
+
+    @property
+    def latest(self) -> float:
+        """Return the newest value in the window."""
+        if not self._count:
+            return None
+        return self._value_at(self._seq - 1)
+
+    @property
+    def minimum(self) -> float:
+        """Return the smallest value in the window."""
+        if not self._count:
+            return None
+        return self._value_at(self._min[0])
+
+    @property
+    def maximum(self) -> float:
+        """Return the largest value in the window."""
+        if not self._count:
+            return None
+        return self._value_at(self._max[0])
+
+    @property
+    def total(self) -> float:
+        """Return the sum of values in the window."""
+        if not self._count:
+            return None
+        return self._sum
+
+    @property
+    def mean(self) -> float:
+        """Return the mean of values in the window."""
+        if not self._count:
+            return None
+        return self._sum / self._count
+
+    @property
+    def change(self) -> float:
+        """Return the difference between the newest and the oldest value."""
+        if not self._count:
+            return None
+        return self.latest - self.first
+
+
+class ObservationHistory:
+    """Rolling history of raw (metric) observations for a single station."""
+
+    def __init__(self, retention: int = 3600, max_samples: int = 720, fields: tuple = HISTORY_FIELDS) -> None:
+        """Initialize the history."""
+        self.retention = retention
+        self.max_samples = max_samples
+        self._windows = {name: RollingWindow(max_samples, retention) for name in fields}
+
+    @property
+    def fields(self) -> tuple:
+        """Return the fields tracked by the history."""
+        return tuple(self._windows)
+
+    def add(self, observation: dict) -> None:
+        """Add a raw observation dict as returned by WeatherFlow."""
+        timestamp = observation.get("timestamp")
+        if timestamp is None:
+            return
+        for name, window in self._windows.items():
+            value = observation.get(name)
+            if value is None:
+                window.expire(timestamp)
+            else:
+                window.append(timestamp, value)
+
+    def window(self, name: str) -> RollingWindow:
+        """Return the rolling window for a field."""
+        return self._windows[name]
+
+    def __getitem__(self, name: str) -> RollingWindow:
+        """Return the rolling window for a field."""
+        return self._windows[name]
@@ -0,0 +1,173 @@
+"""Observation processing for pyweatherflowrest."""
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from pyweatherflowrest.const import UNIT_TYPE_IMPERIAL, UNIT_TYPE_METRIC
+from pyweatherflowrest.data import ObservationDescription, StationDescription
+from pyweatherflowrest.helpers import Calculations, Conversions
+
+
+class ObservationBuilder:
+    """Build an ObservationDescription from a raw station observation."""
+
+    def __init__(self, station: StationDescription, units: str, homeassistant: bool) -> None:
+        """Initialize the builder."""
+        self.station = station
+        self.units = units
+        self.homeassistant = homeassistant
+        self.cnv = Conversions(units, homeassistant)
+        self.calc = Calculations()
+
+    def derive(self, observation: dict) -> dict:
+        """Return the calculated values that do not depend on the unit system."""
+        elevation = self.station.elevation
+        air_temperature = observation.get("air_temperature")
+        return {
+            "beaufort": self.calc.beaufort_value(observation.get("wind_avg")),
+            "cloud_base": self.calc.cloud_base(air_temperature, observation.get("dew_point"), elevation),
+            "freezing_line": self.calc.freezing_line(air_temperature, elevation),
+            "visibility": self.calc.visibility(
+                elevation,
+                air_temperature,
+                observation.get("relative_humidity"),
+                observation.get("dew_point"),
+                self.station.max_visibility,
+            ),
+            "absolute_humidity": self.calc.absolute_humidity(air_temperature, observation.get("relative_humidity")),
+            "precip_intensity": self.calc.precip_intensity(observation.get("precip")),
+            "wind_cardinal": self.calc.wind_direction(observation.get("wind_direction")),
+            "uv_description": self.calc.uv_description(observation.get("uv")),
+            "is_raining": self.calc.is_raining(observation.get("precip")),
+            "is_freezing": self.calc.is_freezing(air_temperature),
+            "is_lightning": self.calc.is_lightning(observation.get("lightning_strike_count")),
+        }
+
+    def build(self, observation: dict, derived: dict | None = None) -> ObservationDescription:
+        """Return observation data from a raw observation.
+
+        derived can be passed from derive() when the same observation is
+        built for several unit systems.
+        """
+        if derived is None:
+            derived = self.derive(observation)
+
+        entity_data = ObservationDescription(
+            key=self.station.key,
+            station_name=self.station.name,
+            utc_time=self.cnv.utc_from_timestamp(observation.get("timestamp")),
+            air_temperature=self.cnv.temperature(observation.get("air_temperature")),
+            barometric_pressure=self.cnv.pressure(observation.get("barometric_pressure")),
+            station_pressure=self.cnv.pressure(observation.get("station_pressure")),
+            sea_level_pressure=self.cnv.pressure(observation.get("sea_level_pressure")),
+            relative_humidity=observation.get("relative_humidity"),
+            precip=self.cnv.rain(observation.get("precip")),
+            precip_rate=self.cnv.rain_rate(observation.get("precip")),
+            precip_intensity=derived["precip_intensity"],
+            precip_accum_last_1hr=self.cnv.rain(observation.get("precip_accum_last_1hr")),
+            precip_accum_local_day=self.cnv.rain(observation.get("precip_accum_local_day")),
+            precip_accum_local_day_final=self.cnv.rain(observation.get("precip_accum_local_day_final")),
+            precip_accum_local_yesterday=self.cnv.rain(observation.get("precip_accum_local_yesterday")),
+            precip_accum_local_yesterday_final=self.cnv.rain(observation.get("precip_accum_local_yesterday_final")),
+            precip_minutes_local_day=observation.get("precip_minutes_local_day"),
+            precip_minutes_local_yesterday=observation.get("precip_minutes_local_yesterday"),
+            precip_minutes_local_yesterday_final=observation.get("precip_minutes_local_yesterday_final"),
+            wind_avg=self.cnv.windspeed(observation.get("wind_avg")),
+            wind_avg_kmh=self.cnv.windspeed_kmh(observation.get("wind_avg")),
+            wind_avg_knots=self.cnv.windspeed_knots(observation.get("wind_avg")),
+            wind_direction=observation.get("wind_direction"),
+            wind_cardinal=derived["wind_cardinal"],
+            wind_gust=self.cnv.windspeed(observation.get("wind_gust")),
+            wind_gust_kmh=self.cnv.windspeed_kmh(observation.get("wind_gust")),
+            wind_gust_knots=self.cnv.windspeed_knots(observation.get("wind_gust")),
+            wind_lull=self.cnv.windspeed(observation.get("wind_lull")),
+            wind_lull_kmh=self.cnv.windspeed_kmh(observation.get("wind_lull")),
+            wind_lull_knots=self.cnv.windspeed_knots(observation.get("wind_lull")),
+            solar_radiation=observation.get("solar_radiation"),
+            uv=self.cnv.uv_index(observation.get("uv")),
+            uv_description=derived["uv_description"],
+            brightness=observation.get("brightness"),
+            lightning_strike_last_epoch=self.cnv.utc_from_timestamp_to_date(
+                observation.get("lightning_strike_last_epoch")
+            ),
+            lightning_strike_last_distance=self.cnv.distance(
+                observation.get("lightning_strike_last_distance")
+            ),
+            lightning_strike_count=observation.get("lightning_strike_count"),
+            lightning_strike_count_last_1hr=observation.get("lightning_strike_count_last_1hr"),
+            lightning_strike_count_last_3hr=observation.get("lightning_strike_count_last_3hr"),
+            feels_like=self.cnv.temperature(observation.get("feels_like")),
+            heat_index=self.cnv.temperature(observation.get("heat_index")),
+            wind_chill=self.cnv.temperature(observation.get("wind_chill")),
+            dew_point=self.cnv.temperature(observation.get("dew_point")),
+            wet_bulb_temperature=self.cnv.temperature(observation.get("wet_bulb_temperature")),
+            delta_t=observation.get("delta_t"),
+            air_density=self.cnv.density(observation.get("air_density")),
+            pressure_trend=observation.get("pressure_trend"),
+            is_raining=derived["is_raining"],
+            is_freezing=derived["is_freezing"],
+            is_lightning=derived["is_lightning"],
+            visibility=self.cnv.distance(derived["visibility"]),
+            absolute_humidity=derived["absolute_humidity"],
+            beaufort=derived["beaufort"].value,
+            beaufort_description=derived["beaufort"].description,
+            cloud_base=self.cnv.altitude(derived["cloud_base"]),
+            freezing_line=self.cnv.altitude(derived["freezing_line"]),
+        )
+
+        return entity_data
+
+
+class BatchConverter:
+    """Convert raw observations to several unit systems in one pass.
+
+    The unit independent calculations are done once per observation, and
+    results are memoized per observation timestamp. Cached objects are
+    shared between calls and should not be modified.
+    """
+
+    def __init__(
+        self,
+        station: StationDescription,
+        unit_systems: tuple = ((UNIT_TYPE_METRIC, False), (UNIT_TYPE_IMPERIAL, False)),
+        cache_size: int = 1024,
+    ) -> None:
+        """Initialize the converter."""
+        self.station = station
+        self.unit_systems = tuple(tuple(item) for item in unit_systems)
+        self.cache_size = cache_size
+        self._builders = [ObservationBuilder(station, units, homeassistant) for units, homeassistant in self.unit_systems]
+        self._cache: OrderedDict = OrderedDict()
+
+    def convert_one(self, observation: dict) -> dict:
+        """Return a single observation converted to every unit system."""
+        timestamp = observation.get("timestamp")
+        if timestamp is not None:
+            cached = self._cache.get(timestamp)
+            if cached is not None:
+                self._cache.move_to_end(timestamp)
+                return cached
+
+        derived = self._builders[0].derive(observation)
+        result = {
+            unit_system: builder.build(observation, derived)
+            for unit_system, builder in zip(self.unit_systems, self._builders)
+        }
+
+        if timestamp is not None and self.cache_size > 0:
+            self._cache[timestamp] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def convert(self, observations: list) -> dict:
+        """Return the observations converted to every unit system.
+
+        The result maps each (units, homeassistant) pair to a list of
+        ObservationDescription in the order of the input.
+        """
+        result = {unit_system: [] for unit_system in self.unit_systems}
+        for observation in observations:
+            for unit_system, entity_data in self.convert_one(observation).items():
+                result[unit_system].append(entity_data)
+        return result
@@ -0,0 +1,78 @@
+"""Adaptive poll interval for pyweatherflowrest."""
+from __future__ import annotations
+
+import time
+
+from pyweatherflowrest.const import (
+    BATTERY_MODE_SAMPLE_INTERVAL,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+)
+
+# Raw observation fields compared between polls to detect changed data.
+CHANGE_FIELDS = (
+    "air_temperature",
+    "relative_humidity",
+    "station_pressure",
+    "precip",
+    "wind_avg",
+    "wind_gust",
+    "solar_radiation",
+    "lightning_strike_count",
+)
+
+
+class AdaptivePollInterval:
+    """Derive the poll interval for a station from its observations.
+
+    The base interval is the sample interval of the reported battery mode.
+    Polls are aligned to when the next observation is expected, and the
+    interval is doubled for every poll that returned unchanged data.
+    """
+
+    def __init__(
+        self,
+        min_interval: int = DEFAULT_MIN_POLL_INTERVAL,
+        max_interval: int = DEFAULT_MAX_POLL_INTERVAL,
+        grace: int = 10,
+    ) -> None:
+        """Initialize the poll interval."""
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.grace = grace
+        self.interval = min_interval
+        self._last_timestamp = None
+        self._last_values = None
+        self._unchanged = 0
+
+    @property
+    def unchanged_polls(self) -> int:
+        """Return number of consecutive polls without new data."""
+        return self._unchanged
+
+    def update(self, observation: dict, battery_mode: int | None = None, now: float | None = None) -> int:
+        """Register a raw observation and return the next poll interval in seconds."""
+        if now is None:
+            now = time.time()
+
+        timestamp = observation.get("timestamp")
+        values = tuple(observation.get(name) for name in CHANGE_FIELDS)
+        if timestamp == self._last_timestamp or values == self._last_values:
+            self._unchanged += 1
+        else:
+            self._unchanged = 0
+        self._last_timestamp = timestamp
+        self._last_values = values
+
+        sample_interval = self.min_interval
+        if battery_mode is not None:
+            sample_interval = max(sample_interval, BATTERY_MODE_SAMPLE_INTERVAL[battery_mode])
+
+        interval = sample_interval * (2 ** min(self._unchanged, 5))
+        if self._unchanged == 0 and timestamp is not None:
+            next_observation = timestamp + sample_interval + self.grace - now
+            if next_observation > 0:
+                interval = min(interval, next_observation)
+
+        self.interval = int(max(self.min_interval, min(interval, self.max_interval)))
+        return self.interval
@@ -0,0 +1,89 @@
+"""Data quality checks for raw observations."""
+from __future__ import annotations
+
+import logging
+
+from pyweatherflowrest.const import QUALITY_LIMITS
+
+_LOGGER = logging.getLogger(__name__)
+
+ISSUE_DUPLICATE = "duplicate_timestamp"
+ISSUE_MISSING = "missing"
+ISSUE_OUT_OF_RANGE = "out_of_range"
+ISSUE_RATE_OF_CHANGE = "rate_of_change"
+
+
+class ObservationFilter:
+    """Check raw observations of one station before values are derived.
+
+    Values outside their valid range or changing faster than allowed per
+    minute are removed. With carry_forward set, removed and missing values are
+    replaced by the last accepted value if it is at most max_carry_seconds
+    old. Only the last accepted value and time per field are kept, along with
+    the last checked observation, which is returned again for observations
+    that are not newer.
+    """
+
+    def __init__(
+        self,
+        limits: dict = None,
+        carry_forward: bool = False,
+        max_carry_seconds: int = 600,
+    ) -> None:
+        """Initialize the filter."""
+        self.limits = dict(QUALITY_LIMITS if limits is None else limits)
+        self.carry_forward = carry_forward
+        self.max_carry_seconds = max_carry_seconds
+        self.issues: dict = {}
+        self.is_duplicate = False
+        self._last_timestamp = None
+        self._last_values: dict = {}
+        self._last_result: dict = None
+
+    def __call__(self, observation: dict) -> dict:
+        """Return a checked copy of a raw observation.
+
+        Issues found are available in issues, keyed on field name.
+        """
+        self.issues = {}
+        timestamp = observation.get("timestamp")
+        self.is_duplicate = (
+            timestamp is not None and self._last_timestamp is not None and timestamp <= self._last_timestamp
+        )
+        if self.is_duplicate:
+            # Nothing new to check, and rate limits need a time difference.
+            self.issues["timestamp"] = ISSUE_DUPLICATE
+            return dict(observation if self._last_result is None else self._last_result)
+        if timestamp is not None:
+            self._last_timestamp = timestamp
+
+        result = dict(observation)
+        for name, (minimum, maximum, max_rate) in self.limits.items():
+            value = observation.get(name)
+            last = self._last_values.get(name)
+
+            if value is None:
+                if name in observation:
+                    self.issues[name] = ISSUE_MISSING
+            elif value < minimum or value > maximum:
+                self.issues[name] = ISSUE_OUT_OF_RANGE
+                value = None
+            elif max_rate is not None and last is not None and timestamp is not None:
+                minutes = max((timestamp - last[1]) / 60, 1)
+                if abs(value - last[0]) > max_rate * minutes:
+                    self.issues[name] = ISSUE_RATE_OF_CHANGE
+                    value = None
+
+            if value is not None:
+                if timestamp is not None:
+                    self._last_values[name] = (value, timestamp)
+            elif self.carry_forward and last is not None and timestamp is not None:
+                if timestamp - last[1] <= self.max_carry_seconds:
+                    value = last[0]
+            if name in observation or value is not None:
+                result[name] = value
+
+        if self.issues:
+            _LOGGER.debug("Observation quality issues at %s: %s", timestamp, self.issues)
+        self._last_result = result
+        return dict(result)
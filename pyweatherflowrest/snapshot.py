@@ -0,0 +1,339 @@
+"""Compact binary snapshots of the pyweatherflowrest dataclasses.
+
+A snapshot starts with a header holding a magic value, the format version, the
+record type and a hash of the field names of all record types. It is followed
+by a table of all strings, a table of record layouts and the records.
+
+A record layout is the record type and the kind of value in each field, for
+example float, None or string. Records with the same layout, such as the items
+of an hourly forecast, share it, and the fixed width part of a record is read
+with a single precompiled struct. Strings are stored once in the string table
+and referenced by index. Lists and nested records follow the fixed width part.
+Values are matched to fields by position, so a snapshot written with other
+dataclass fields is rejected.
+"""
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import fields
+from itertools import accumulate
+import struct
+import zlib
+
+from pyweatherflowrest.data import (
+    DeviceDescription,
+    ForecastDailyDescription,
+    ForecastDescription,
+    ForecastHourlyDescription,
+    ObservationDescription,
+    StationDescription,
+)
+from pyweatherflowrest.exceptions import Invalid
+
+SNAPSHOT_MAGIC = b"WF"
+SNAPSHOT_VERSION = 3
+
+RECORD_TYPES = {
+    1: StationDescription,
+    2: ObservationDescription,
+    3: ForecastDescription,
+    4: DeviceDescription,
+    5: ForecastDailyDescription,
+    6: ForecastHourlyDescription,
+}
+_RECORD_CODES = {cls: code for code, cls in RECORD_TYPES.items()}
+_RECORD_FIELDS = {cls: tuple(item.name for item in fields(cls)) for cls in RECORD_TYPES.values()}
+SCHEMA_HASH = zlib.crc32(
+    ";".join(f"{code}:{','.join(_RECORD_FIELDS[cls])}" for code, cls in sorted(RECORD_TYPES.items())).encode()
+)
+
+_HEADER = struct.Struct("<2sBBI")
+_COUNT = struct.Struct("<I")
+_LAYOUT_ID = struct.Struct("<H")
+
+# Kinds of field values, and their struct format in the fixed width part of a
+# record. None, lists and nested records only take a placeholder byte there.
+_KIND_NONE = ord("N")
+_KIND_BOOL = ord("?")
+_KIND_INT = ord("q")
+_KIND_FLOAT = ord("d")
+_KIND_STR = ord("s")
+_KIND_DATETIME = ord("t")
+_KIND_LIST = ord("L")
+_KIND_RECORD = ord("R")
+_KIND_FORMATS = {
+    _KIND_NONE: "?",
+    _KIND_BOOL: "?",
+    _KIND_INT: "q",
+    _KIND_FLOAT: "d",
+    _KIND_STR: "I",
+    _KIND_DATETIME: "I",
+    _KIND_LIST: "?",
+    _KIND_RECORD: "?",
+}
+_KINDS_BY_TYPE = {
+    type(None): _KIND_NONE,
+    bool: _KIND_BOOL,
+    int: _KIND_INT,
+    float: _KIND_FLOAT,
+    str: _KIND_STR,
+    list: _KIND_LIST,
+    dt.datetime: _KIND_DATETIME,
+}
+_KINDS_BY_TYPE.update({cls: _KIND_RECORD for cls in RECORD_TYPES.values()})
+
+# A list holds either records that share a layout without lists or nested
+# records, stored back to back, or values each prefixed with their kind.
+_LIST_RECORDS = ord("r")
+_LIST_ITEMS = ord("i")
+
+# Compiled layouts, keyed on record code and field kinds.
+_LAYOUTS: dict = {}
+
+
+def _value_kind(value) -> int:
+    """Return the kind of a field value."""
+    kind = _KINDS_BY_TYPE.get(type(value))
+    if kind is not None:
+        return kind
+    for value_type in (bool, int, float, str, list, dt.datetime):
+        if isinstance(value, value_type):
+            return _KINDS_BY_TYPE[value_type]
+    raise TypeError(f"Cannot add value of type {type(value).__name__} to a snapshot")
+
+
+def _layout(code: int, kinds: bytes) -> tuple:
+    """Return the record type, struct and fields that need converting for a layout."""
+    layout = _LAYOUTS.get((code, kinds))
+    if layout is None:
+        cls = RECORD_TYPES[code]
+        record = struct.Struct("<" + "".join(_KIND_FORMATS[kind] for kind in kinds))
+        converted = tuple(
+            (index, kind)
+            for index, kind in enumerate(kinds)
+            if kind not in (_KIND_BOOL, _KIND_INT, _KIND_FLOAT)
+        )
+        layout = _LAYOUTS[(code, kinds)] = (cls, record, converted)
+    return layout
+
+
+class _Writer:
+    """Collect strings, layouts and records of one snapshot."""
+
+    def __init__(self) -> None:
+        """Initialize the writer."""
+        self.body = bytearray()
+        self.strings: dict = {}
+        self.layouts: dict = {}
+
+    def string(self, value: str) -> int:
+        """Return the index of a string in the string table."""
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def fields(self, entity) -> tuple:
+        """Return the layout id, struct, fixed width values and nested values of a record."""
+        cls = type(entity)
+        code = _RECORD_CODES[cls]
+        values = [getattr(entity, name) for name in _RECORD_FIELDS[cls]]
+        kinds = bytes([_value_kind(value) for value in values])
+        layout_id = self.layouts.get((code, kinds))
+        if layout_id is None:
+            layout_id = self.layouts[(code, kinds)] = len(self.layouts)
+        _, record, converted = _layout(code, kinds)
+
+        nested = []
+        for index, kind in converted:
+            value = values[index]
+            if kind == _KIND_STR:
+                values[index] = self.string(value)
+            elif kind == _KIND_DATETIME:
+                values[index] = self.string(value.isoformat())
+            else:
+                values[index] = False
+                if kind != _KIND_NONE:
+                    nested.append((kind, value))
+        return layout_id, record, values, nested
+
+    def record(self, entity) -> None:
+        """Append a dataclass record."""
+        layout_id, record, values, nested = self.fields(entity)
+        self.body += _LAYOUT_ID.pack(layout_id)
+        self.body += record.pack(*values)
+        for kind, value in nested:
+            if kind == _KIND_RECORD:
+                self.record(value)
+            else:
+                self.list(value)
+
+    def list(self, items: list) -> None:
+        """Append a list of values."""
+        self.body += _COUNT.pack(len(items))
+        if items and all(type(item) in _RECORD_CODES for item in items):
+            rows = [self.fields(item) for item in items]
+            layout_id, record = rows[0][0], rows[0][1]
+            if all(row[0] == layout_id and not row[3] for row in rows):
+                self.body.append(_LIST_RECORDS)
+                self.body += _LAYOUT_ID.pack(layout_id)
+                for row in rows:
+                    self.body += record.pack(*row[2])
+                return
+
+        self.body.append(_LIST_ITEMS)
+        for item in items:
+            kind = _value_kind(item)
+            self.body.append(kind)
+            if kind == _KIND_RECORD:
+                self.record(item)
+            elif kind == _KIND_LIST:
+                self.list(item)
+            elif kind in (_KIND_STR, _KIND_DATETIME):
+                self.body += _COUNT.pack(self.string(item if kind == _KIND_STR else item.isoformat()))
+            elif kind != _KIND_NONE:
+                self.body += struct.pack("<" + _KIND_FORMATS[kind], item)
+
+    def tables(self) -> bytes:
+        """Return the string and layout tables."""
+        strings = list(self.strings)
+        text = "".join(strings).encode("utf-8")
+        buffer = bytearray(_COUNT.pack(len(strings)))
+        buffer += _COUNT.pack(len(text))
+        buffer += struct.pack(f"<{len(strings)}I", *(len(item) for item in strings))
+        buffer += text
+        buffer += _LAYOUT_ID.pack(len(self.layouts))
+        for code, kinds in self.layouts:
+            buffer.append(code)
+            buffer += kinds
+        return bytes(buffer)
+
+
+class _Reader:
+    """Read the records of one snapshot."""
+
+    def __init__(self, data: bytes, pos: int) -> None:
+        """Read the string and layout tables."""
+        self.data = data
+        count = _COUNT.unpack_from(data, pos)[0]
+        size = _COUNT.unpack_from(data, pos + _COUNT.size)[0]
+        pos += 2 * _COUNT.size
+        # String lengths are in characters, so all text is decoded at once
+        # and then split.
+        lengths = struct.unpack_from(f"<{count}I", data, pos)
+        pos += 4 * count
+        text = data[pos : pos + size].decode("utf-8")
+        pos += size
+        self.strings = [text[end - length : end] for length, end in zip(lengths, accumulate(lengths))]
+
+        count = _LAYOUT_ID.unpack_from(data, pos)[0]
+        pos += _LAYOUT_ID.size
+        self.layouts = []
+        for _ in range(count):
+            code = data[pos]
+            width = len(_RECORD_FIELDS[RECORD_TYPES[code]])
+            self.layouts.append(_layout(code, data[pos + 1 : pos + 1 + width]))
+            pos += 1 + width
+        self.pos = pos
+
+    def record(self):
+        """Return the next dataclass record."""
+        data = self.data
+        cls, record, converted = self.layouts[_LAYOUT_ID.unpack_from(data, self.pos)[0]]
+        values = list(record.unpack_from(data, self.pos + _LAYOUT_ID.size))
+        self.pos += _LAYOUT_ID.size + record.size
+        strings = self.strings
+        for index, kind in converted:
+            if kind == _KIND_STR:
+                values[index] = strings[values[index]]
+            elif kind == _KIND_NONE:
+                values[index] = None
+            elif kind == _KIND_RECORD:
+                values[index] = self.record()
+            elif kind == _KIND_LIST:
+                values[index] = self.list()
+            else:
+                values[index] = dt.datetime.fromisoformat(strings[values[index]])
+        return cls(*values)
+
+    def list(self) -> list:
+        """Return the next list of values."""
+        data = self.data
+        count = _COUNT.unpack_from(data, self.pos)[0]
+        mode = data[self.pos + _COUNT.size]
+        self.pos += _COUNT.size + 1
+        if mode == _LIST_RECORDS:
+            return self.records(count)
+        if mode != _LIST_ITEMS:
+            raise Invalid(f"Unknown list type {mode} in snapshot")
+
+        items = []
+        for _ in range(count):
+            kind = data[self.pos]
+            self.pos += 1
+            if kind == _KIND_RECORD:
+                items.append(self.record())
+            elif kind == _KIND_LIST:
+                items.append(self.list())
+            elif kind == _KIND_NONE:
+                items.append(None)
+            elif kind in (_KIND_STR, _KIND_DATETIME):
+                item = self.strings[_COUNT.unpack_from(data, self.pos)[0]]
+                self.pos += _COUNT.size
+                items.append(item if kind == _KIND_STR else dt.datetime.fromisoformat(item))
+            else:
+                item_format = struct.Struct("<" + _KIND_FORMATS[kind])
+                items.append(item_format.unpack_from(data, self.pos)[0])
+                self.pos += item_format.size
+        return items
+
+    def records(self, count: int) -> list:
+        """Return count records that share a layout and are stored back to back."""
+        cls, record, converted = self.layouts[_LAYOUT_ID.unpack_from(self.data, self.pos)[0]]
+        start = self.pos + _LAYOUT_ID.size
+        self.pos = start + count * record.size
+        strings = self.strings
+        items = []
+        for values in record.iter_unpack(memoryview(self.data)[start : self.pos]):
+            values = list(values)
+            for index, kind in converted:
+                if kind == _KIND_STR:
+                    values[index] = strings[values[index]]
+                elif kind == _KIND_NONE:
+                    values[index] = None
+                elif kind == _KIND_DATETIME:
+                    values[index] = dt.datetime.fromisoformat(strings[values[index]])
+                else:
+                    raise Invalid("Snapshot is corrupt")
+            items.append(cls(*values))
+        return items
+
+
+def dumps(entity) -> bytes:
+    """Return a binary snapshot of a Station, Observation or Forecast Description."""
+    code = _RECORD_CODES.get(type(entity))
+    if code is None:
+        raise TypeError(f"Cannot create a snapshot of {type(entity).__name__}")
+    writer = _Writer()
+    writer.record(entity)
+    return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, code, SCHEMA_HASH) + writer.tables() + writer.body
+
+
+def loads(data: bytes):
+    """Return the dataclass stored in a binary snapshot."""
+    data = bytes(data)
+    try:
+        magic, version, code, schema_hash = _HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise Invalid("Data is not a WeatherFlow snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise Invalid(f"Snapshot version {version} is not supported")
+        if schema_hash != SCHEMA_HASH:
+            raise Invalid("Snapshot was written with different dataclass fields")
+        reader = _Reader(data, _HEADER.size)
+        entity = reader.record()
+    except (struct.error, KeyError, IndexError, ValueError, TypeError) as err:
+        raise Invalid(f"Snapshot is corrupt: {err}") from None
+    if reader.pos != len(data) or _RECORD_CODES[type(entity)] != code:
+        raise Invalid("Snapshot is corrupt")
+    return entity
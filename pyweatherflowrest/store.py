@@ -0,0 +1,160 @@
+"""Append-only local observation store for pyweatherflowrest."""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import math
+import sqlite3
+import threading
+
+# Raw (metric) observation fields kept in the store, and the aggregate used
+# when rolling them up to hours or days.
+STORE_FIELDS = {
+    "air_temperature": "AVG",
+    "barometric_pressure": "AVG",
+    "station_pressure": "AVG",
+    "sea_level_pressure": "AVG",
+    "relative_humidity": "AVG",
+    "dew_point": "AVG",
+    "feels_like": "AVG",
+    "precip": "SUM",
+    "wind_avg": "AVG",
+    "wind_direction": "CIRCULAR_AVG",
+    "wind_gust": "MAX",
+    "wind_lull": "MIN",
+    "solar_radiation": "AVG",
+    "uv": "MAX",
+    "brightness": "AVG",
+    "lightning_strike_count": "SUM",
+    "lightning_strike_last_distance": "MIN",
+}
+
+ROLLUP_INTERVALS = {
+    "hour": 3600,
+    "day": 86400,
+}
+
+
+class CircularMean:
+    """SQLite aggregate that returns the mean of angles in degrees.
+
+    Opposite directions cancel out and have no mean, which returns None.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the aggregate."""
+        self.sin = 0.0
+        self.cos = 0.0
+
+    def step(self, value: float) -> None:
+        """Add an angle."""
+        if value is not None:
+            angle = math.radians(value)
+            self.sin += math.sin(angle)
+            self.cos += math.cos(angle)
+
+    def finalize(self) -> float | None:
+        """Return the mean angle."""
+        if math.hypot(self.sin, self.cos) < 1e-9:
+            return None
+        # Rounding first keeps angles just below north from becoming 360.0.
+        return round(math.degrees(math.atan2(self.sin, self.cos)), 1) % 360
+
+
+class ObservationStore:
+    """Store raw observations per station in SQLite with a time index.
+
+    Rows are keyed on (station_id, timestamp), so range queries only touch
+    the requested interval and duplicate observations are ignored. The
+    connection is guarded by a lock, so append_async can write from a worker
+    thread while the event loop keeps running.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """Open or create the store."""
+        self.path = path
+        self._fields = tuple(STORE_FIELDS)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.create_aggregate("CIRCULAR_AVG", 1, CircularMean)
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = None
+        columns = ", ".join(f"{name} REAL" for name in self._fields)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS observations ("
+            f"station_id INTEGER NOT NULL, timestamp INTEGER NOT NULL, {columns}, "
+            f"PRIMARY KEY (station_id, timestamp)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        placeholders = ", ".join("?" for _ in range(len(self._fields) + 2))
+        self._insert_sql = (
+            f"INSERT OR IGNORE INTO observations (station_id, timestamp, {', '.join(self._fields)}) "
+            f"VALUES ({placeholders})"
+        )
+
+    def close(self) -> None:
+        """Close the store."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            self._conn.close()
+
+    def append(self, station_id: int, observation: dict) -> None:
+        """Append a raw observation dict as returned by WeatherFlow."""
+        self.append_many(station_id, [observation])
+
+    async def append_async(self, station_id: int, observation: dict) -> None:
+        """Append a raw observation in a worker thread, off the event loop."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyweatherflowrest-store")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.append, station_id, observation)
+
+    def append_many(self, station_id: int, observations: list) -> None:
+        """Append several raw observation dicts in one transaction."""
+        rows = [
+            (station_id, item["timestamp"], *(item.get(name) for name in self._fields))
+            for item in observations
+            if item.get("timestamp") is not None
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(self._insert_sql, rows)
+
+    def range(self, station_id: int, start: int, end: int) -> list[dict]:
+        """Return stored observations with start <= timestamp < end."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT timestamp, {', '.join(self._fields)} FROM observations "
+                f"WHERE station_id = ? AND timestamp >= ? AND timestamp < ? ORDER BY timestamp",
+                (station_id, start, end),
+            ).fetchall()
+        names = ("timestamp",) + self._fields
+        return [dict(zip(names, row)) for row in rows]
+
+    def rollup(self, station_id: int, start: int, end: int, interval="hour") -> list[dict]:
+        """Return observations aggregated per interval.
+
+        interval is "hour", "day" or a number of seconds. Buckets are aligned
+        to UTC, and each bucket holds the number of samples in "count".
+        """
+        seconds = ROLLUP_INTERVALS.get(interval, interval)
+        if not isinstance(seconds, int) or seconds <= 0:
+            raise ValueError(f"Invalid rollup interval: {interval}")
+
+        aggregates = ", ".join(f"{func}({name})" for name, func in STORE_FIELDS.items())
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT (timestamp / ?) * ? AS bucket, COUNT(*), {aggregates} FROM observations "
+                f"WHERE station_id = ? AND timestamp >= ? AND timestamp < ? GROUP BY bucket ORDER BY bucket",
+                (seconds, seconds, station_id, start, end),
+            ).fetchall()
+        names = ("timestamp", "count") + self._fields
+        return [dict(zip(names, row)) for row in rows]
+
+    def prune(self, station_id: int, before: int) -> int:
+        """Delete observations older than before and return the number removed."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM observations WHERE station_id = ? AND timestamp < ?", (station_id, before)
+            )
+        return cursor.rowcount
@@ -95,7 +95,7 @@ async def main() -> None:
 
     end = time.time()
 
-    await weatherflow.req.close()
+    await weatherflow.close()
 
     _LOGGER.info("Execution time: %s seconds", end - start)
 
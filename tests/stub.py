@@ -0,0 +1,181 @@
+"""Canned WeatherFlow responses and a client that answers from them."""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+from pyweatherflowrest import WeatherFlowApiClient
+from pyweatherflowrest.exceptions import NotAuthorized
+
+NOW = int(time.time())
+HOUR_START = NOW - NOW % 3600
+
+STATION = {
+    "status": {"status_code": 0},
+    "stations": [
+        {
+            "name": "Home",
+            "public_name": "Home",
+            "latitude": 55.6,
+            "longitude": 12.5,
+            "timezone": "Europe/Copenhagen",
+            "station_meta": {"elevation": 40},
+            "devices": [
+                {
+                    "device_type": "ST",
+                    "device_id": 2,
+                    "device_meta": {"name": "ST"},
+                    "hardware_revision": 1,
+                    "firmware_revision": 1,
+                    "serial_number": "ST-1",
+                },
+            ],
+        }
+    ],
+}
+
+DEVICE = {"status": {"status_code": 0}, "obs": [[NOW] + [0] * 15 + [2.6] + [0] * 5]}
+
+
+def observation(timestamp: int = NOW, **values) -> dict:
+    """Return a raw station observation."""
+    item = {
+        "timestamp": timestamp,
+        "air_temperature": 12.3,
+        "barometric_pressure": 1010,
+        "station_pressure": 1008,
+        "sea_level_pressure": 1013,
+        "relative_humidity": 80,
+        "precip": 0.0,
+        "wind_avg": 3.2,
+        "wind_direction": 200,
+        "wind_gust": 5.1,
+        "wind_lull": 1.0,
+        "solar_radiation": 300,
+        "uv": 2.1,
+        "brightness": 30000,
+        "lightning_strike_count": 0,
+        "feels_like": 11,
+        "dew_point": 9,
+        "pressure_trend": "steady",
+    }
+    item.update(values)
+    return item
+
+
+def forecast(days: int = 10) -> dict:
+    """Return a forecast response with days of daily and hourly items."""
+    daily = []
+    hourly = []
+    for day in range(days):
+        day_start = HOUR_START + day * 86400
+        daily.append(
+            {
+                "day_start_local": day_start,
+                "day_num": day + 1,
+                "conditions": "Clear",
+                "icon": "clear-day",
+                "sunrise": day_start + 20000,
+                "sunset": day_start + 60000,
+                "air_temp_high": 15,
+                "air_temp_low": 5,
+                "precip_probability": 10,
+            }
+        )
+        for hour in range(24):
+            hourly.append(
+                {
+                    "time": day_start + hour * 3600,
+                    "local_day": day + 1,
+                    "conditions": "Clear",
+                    "icon": "clear-day",
+                    "air_temperature": 10 + hour % 5,
+                    "sea_level_pressure": 1012,
+                    "relative_humidity": 70,
+                    "precip": 0.1,
+                    "precip_probability": 5,
+                    "wind_avg": 3,
+                    "wind_direction": 350 if hour % 2 else 10,
+                    "wind_direction_cardinal": "N",
+                    "wind_gust": 5,
+                    "uv": 1,
+                    "feels_like": 9,
+                }
+            )
+    return {
+        "status": {"status_code": 0},
+        "current_conditions": {
+            "time": NOW,
+            "conditions": "Clear",
+            "icon": "clear-day",
+            "air_temperature": 12,
+            "station_pressure": 1008,
+            "sea_level_pressure": 1013,
+            "relative_humidity": 80,
+            "wind_avg": 3,
+            "wind_direction": 200,
+            "wind_gust": 5,
+        },
+        "forecast": {"daily": daily, "hourly": hourly},
+    }
+
+
+def endpoint_kind(endpoint: str) -> str:
+    """Return the kind of data requested from an endpoint."""
+    if "better_forecast" in endpoint:
+        return "forecast"
+    if "/observations/device/" in endpoint:
+        return "device"
+    if "/observations/station/" in endpoint:
+        return "observations"
+    return "station"
+
+
+class StubClient(WeatherFlowApiClient):
+    """Client that answers requests with canned responses.
+
+    responses maps a kind of request to the response data, or to an exception
+    that is raised. A kind listed in gates waits for its asyncio.Event before
+    answering, and calls counts the requests per kind.
+    """
+
+    def __init__(self, *args, responses: dict = None, gates: dict = None, **kwargs) -> None:
+        """Initialize the client."""
+        super().__init__(*args, **kwargs)
+        self.responses = {
+            "station": STATION,
+            "device": DEVICE,
+            "observations": {"status": {"status_code": 0}, "obs": [observation()]},
+            "forecast": forecast(),
+        }
+        self.responses.update(responses or {})
+        self.gates = dict(gates or {})
+        self.calls: dict = {}
+
+    async def _request(self, url: str, decode: bool, endpoint: str):
+        """Return the canned response for the endpoint."""
+        kind = endpoint_kind(endpoint)
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+        gate = self.gates.get(kind)
+        if gate is not None:
+            await gate.wait()
+        data = self.responses[kind]
+        if isinstance(data, BaseException):
+            raise data
+        if not decode:
+            return json.dumps(data).encode()
+        if data["status"]["status_code"] == 401:
+            raise NotAuthorized(
+                "The Token supplied is not valid for the Station ID. Cannot continue.",
+                station_id=self.station_id,
+                endpoint=endpoint,
+                status=401,
+            )
+        return data
+
+
+async def settle() -> None:
+    """Let scheduled tasks run until they wait on something."""
+    for _ in range(5):
+        await asyncio.sleep(0)
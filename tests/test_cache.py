@@ -0,0 +1,120 @@
+"""Behavior of the shared cache between clients watching the same station."""
+import asyncio
+
+import pytest
+
+from pyweatherflowrest.cache import SharedCache
+from pyweatherflowrest.exceptions import Invalid, NotAuthorized
+
+from tests.stub import StubClient, settle
+
+
+async def _clients(cache: SharedCache, count: int, gate: asyncio.Event = None) -> list:
+    """Return initialized clients sharing the cache."""
+    clients = []
+    for _ in range(count):
+        client = StubClient(1, "token", shared_cache=cache, gates={"observations": gate} if gate else None)
+        await client.initialize()
+        clients.append(client)
+    return clients
+
+
+def test_concurrent_updates_share_one_fetch():
+    """Clients updating at the same time make a single upstream request."""
+
+    async def run():
+        cache = SharedCache()
+        gate = asyncio.Event()
+        clients = await _clients(cache, 3, gate)
+        tasks = [asyncio.ensure_future(client.update_observations()) for client in clients]
+        await settle()
+        gate.set()
+        results = await asyncio.gather(*tasks)
+        assert sum(client.calls.get("observations", 0) for client in clients) == 1
+        assert all(result is results[0] for result in results)
+
+        # Within the ttl the cached data is returned without a request.
+        assert await clients[0].update_observations() is results[0]
+        assert sum(client.calls.get("observations", 0) for client in clients) == 1
+
+    asyncio.run(run())
+
+
+def test_cancelled_fetch_is_retried_by_waiter():
+    """A waiter is not cancelled with the shared fetch and fetches itself."""
+
+    async def run():
+        cache = SharedCache()
+        gate = asyncio.Event()
+        first, second = await _clients(cache, 2, gate)
+        owner = asyncio.ensure_future(first.update_observations())
+        await settle()
+        waiter = asyncio.ensure_future(second.update_observations())
+        await settle()
+        assert second.calls.get("observations", 0) == 0
+
+        owner.cancel()
+        await settle()
+        assert not waiter.done()
+        assert second.calls["observations"] == 1
+        gate.set()
+        entity_data = await waiter
+        assert entity_data is not None
+        assert owner.cancelled()
+
+    asyncio.run(run())
+
+
+def test_failed_fetch_is_raised_to_waiters():
+    """An error in the shared fetch reaches every client waiting on it."""
+
+    async def run():
+        cache = SharedCache()
+        gate = asyncio.Event()
+        clients = await _clients(cache, 2, gate)
+        for client in clients:
+            client.responses["observations"] = {"status": {"status_code": 0}, "obs": []}
+        tasks = [asyncio.ensure_future(client.update_observations()) for client in clients]
+        await settle()
+        gate.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(result, Invalid) for result in results)
+        assert sum(client.calls.get("observations", 0) for client in clients) == 1
+
+    asyncio.run(run())
+
+
+def test_unvalidated_token_fetches_itself():
+    """A client whose token was not validated never gets the cached data."""
+
+    async def run():
+        cache = SharedCache()
+        (owner,) = await _clients(cache, 1)
+        await owner.update_observations()
+
+        intruder = StubClient(1, "other", shared_cache=cache)
+        intruder._station_data = owner._station_data
+        intruder.responses["observations"] = {"status": {"status_code": 401}}
+        with pytest.raises(NotAuthorized):
+            await intruder.update_observations()
+        assert intruder.calls["observations"] == 1
+        assert not cache.is_authorized(1, "other")
+
+    asyncio.run(run())
+
+
+def test_last_subscriber_drops_station_entries():
+    """Cached data is dropped when the last client of a station closes."""
+
+    async def run():
+        cache = SharedCache()
+        first, second = await _clients(cache, 2)
+        await first.update_observations()
+        await first.close()
+        assert cache.subscribers(1) == 1
+        assert cache._entries
+        await second.close()
+        assert cache.subscribers(1) == 0
+        assert not cache._entries
+
+    asyncio.run(run())
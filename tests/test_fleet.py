@@ -0,0 +1,130 @@
+"""Behavior of the memory bounded fleet state."""
+import asyncio
+
+from pyweatherflowrest.fleet import FleetState
+
+from tests.stub import StubClient, settle
+
+
+async def _client(fleet: FleetState, station_id: int, forecast_hours: int = 240) -> StubClient:
+    """Return an initialized client with observations and forecast."""
+    client = StubClient(station_id, "token", fleet_state=fleet, forecast_hours=forecast_hours)
+    await client.initialize()
+    await client.update_observations()
+    await client.update_forecast()
+    return client
+
+
+def _hours(client: StubClient) -> int:
+    """Return the number of hourly forecast items the client holds."""
+    return len(client._forecast_data.forecast_hourly)
+
+
+def test_budget_reduces_least_recently_read_slot():
+    """Polling does not protect a slot from reduction, a consumer read does."""
+
+    async def run():
+        fleet = FleetState(max_bytes=10**9, cold_forecast_hours=12)
+        read = await _client(fleet, 1)
+        polled = await _client(fleet, 2)
+        read.observation_states()
+        read.forecast_attributes()
+        await polled.update_observations()
+        await polled.update_forecast()
+
+        fleet.max_bytes = fleet.size - 1
+        fleet._enforce_budget(None)
+        assert _hours(read) == 240
+        assert _hours(polled) == 12
+        assert fleet.is_trimmed(polled._fleet_key)
+        assert fleet.size <= fleet.max_bytes
+
+    asyncio.run(run())
+
+
+def test_budget_packs_and_drops_in_order():
+    """Slots are packed before observations and forecasts are dropped."""
+
+    async def run():
+        # Trimming leaves a forecast of cold_forecast_hours unchanged.
+        fleet = FleetState(max_bytes=10**9, cold_forecast_hours=240)
+        older = await _client(fleet, 1)
+        newer = await _client(fleet, 2)
+        newer.observation_states()
+        expected = older._observation_data
+
+        fleet.max_bytes = fleet.size - 1
+        fleet._enforce_budget(None)
+        slot = fleet._slots[older._fleet_key]
+        assert all(entry[1] for entry in slot.values())
+        assert not any(entry[1] for entry in fleet._slots[newer._fleet_key].values())
+        # Packed state is unpacked unchanged when accessed.
+        assert older._observation_data == expected
+
+        fleet.max_bytes = 1
+        fleet._enforce_budget(newer._fleet_key)
+        assert newer._observation_data is not None
+        assert older._observation_data is None
+        assert older._forecast_data is None
+        assert older._station_data is not None
+
+        # A consumer read fetches dropped data again.
+        assert await older.read_observations() is not None
+        assert older.calls["observations"] == 2
+
+    asyncio.run(run())
+
+
+def test_cold_slot_builds_short_forecast_until_read():
+    """A slot that is only polled stays cold, and a read fetches the full forecast."""
+
+    async def run():
+        fleet = FleetState(cold_after=0.05, cold_forecast_hours=12)
+        client = StubClient(1, "token", fleet_state=fleet, forecast_hours=240)
+        await client.initialize()
+        await asyncio.sleep(0.1)
+        for _ in range(3):
+            await client.update_forecast()
+        assert fleet.is_cold(client._fleet_key)
+        assert _hours(client) == 12
+
+        forecast = await client.read_forecast()
+        assert len(forecast.forecast_hourly) == 240
+        assert not fleet.is_cold(client._fleet_key)
+
+    asyncio.run(run())
+
+
+def test_forecast_attributes_rehydrate_in_background():
+    """Reading attributes of a reduced forecast fetches the full one in the background."""
+
+    async def run():
+        fleet = FleetState(cold_after=0.05, cold_forecast_hours=12)
+        client = StubClient(1, "token", fleet_state=fleet, forecast_hours=240)
+        await client.initialize()
+        await asyncio.sleep(0.1)
+        await client.update_forecast()
+        assert _hours(client) == 12
+
+        client.forecast_attributes()
+        await settle()
+        assert _hours(client) == 240
+        assert not client._forecast_is_reduced()
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_released_slot_frees_its_size():
+    """Closing a client removes its state from the fleet."""
+
+    async def run():
+        fleet = FleetState()
+        client = await _client(fleet, 1)
+        assert len(fleet) == 1
+        assert fleet.size > 0
+        await client.close()
+        assert len(fleet) == 0
+        assert fleet.size == 0
+
+    asyncio.run(run())
@@ -0,0 +1,127 @@
+"""Behavior of hedged requests."""
+import asyncio
+
+from aiohttp import ClientConnectionError
+import pytest
+
+from pyweatherflowrest.exceptions import BadRequest, NotAuthorized
+from pyweatherflowrest.hedging import RequestHedging
+
+from tests.stub import StubClient
+
+
+class ScriptedClient(StubClient):
+    """Client whose requests answer after a scripted delay.
+
+    Each request takes the next (seconds, result) pair from script, where a
+    result that is an exception is raised.
+    """
+
+    def __init__(self, *args, script: list, **kwargs) -> None:
+        """Initialize the client."""
+        super().__init__(*args, **kwargs)
+        self.script = list(script)
+        self.started = 0
+        self.cancelled = 0
+
+    async def _request(self, url: str, decode: bool, endpoint: str):
+        """Answer with the next scripted result."""
+        seconds, result = self.script[self.started]
+        self.started += 1
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+
+def _hedging(samples: int = 20, latency: float = 0.01, budget: float = 1.0) -> RequestHedging:
+    """Return a hedging policy with recorded observation latencies."""
+    hedging = RequestHedging(budget=budget, min_samples=samples, min_delay=0.01)
+    for _ in range(samples):
+        hedging.record("observations", latency)
+    return hedging
+
+
+def _request(client: ScriptedClient, kind: str = "observations"):
+    """Return the result of a request of a kind, hedged if the policy lists it."""
+    url = client.forecast_url if kind == "forecast" else client.observation_url
+    return asyncio.run(client._api_request(url, kind=kind))
+
+
+def test_slow_request_is_hedged():
+    """A duplicate is sent when the first request is slow, and the first answer wins."""
+    hedging = _hedging()
+    client = ScriptedClient(1, "token", request_hedging=hedging, script=[(1, "slow"), (0, "fast")])
+    assert _request(client) == "fast"
+    assert hedging.hedges == 1
+    assert hedging.hedge_wins == 1
+    assert client.cancelled == 1
+
+
+def test_fast_request_is_not_hedged():
+    """No duplicate is sent when the first request answers in time."""
+    hedging = _hedging(latency=0.5)
+    client = ScriptedClient(1, "token", request_hedging=hedging, script=[(0, "fast")])
+    assert _request(client) == "fast"
+    assert client.started == 1
+    assert hedging.hedges == 0
+
+
+def test_no_hedge_without_samples_or_budget():
+    """Hedging waits for enough latency samples and stays within its budget."""
+    hedging = _hedging(samples=20)
+    hedging.min_samples = 21
+    client = ScriptedClient(1, "token", request_hedging=hedging, script=[(0.05, "slow")])
+    assert _request(client) == "slow"
+    assert client.started == 1
+
+    hedging = _hedging(budget=0.5)
+    client = ScriptedClient(
+        1, "token", request_hedging=hedging, script=[(0.05, "first"), (0.05, "second"), (0, "hedge")]
+    )
+    assert _request(client) == "first"
+    assert _request(client) == "hedge"
+    assert hedging.requests == 2
+    assert hedging.hedges == 1
+
+
+def test_hedge_covers_a_failed_request():
+    """A connection error is only raised when both requests failed."""
+    hedging = _hedging()
+    client = ScriptedClient(
+        1, "token", request_hedging=hedging, script=[(0.05, ClientConnectionError()), (0.1, "hedge")]
+    )
+    assert _request(client) == "hedge"
+
+    client = ScriptedClient(
+        1,
+        "token",
+        request_hedging=hedging,
+        script=[(0.05, ClientConnectionError()), (0, ClientConnectionError())],
+    )
+    with pytest.raises(BadRequest):
+        _request(client)
+
+
+def test_weatherflow_error_is_raised_at_once():
+    """A WeatherFlow error is raised without waiting for the duplicate."""
+    hedging = _hedging()
+    client = ScriptedClient(
+        1, "token", request_hedging=hedging, script=[(0.05, NotAuthorized("bad token")), (1, "hedge")]
+    )
+    with pytest.raises(NotAuthorized):
+        _request(client)
+    assert client.cancelled == 1
+
+
+def test_unlisted_kind_is_not_hedged():
+    """Only kinds listed in the policy are hedged, and forecasts are not by default."""
+    hedging = _hedging()
+    hedging.record("forecast", 0.01)
+    client = ScriptedClient(1, "token", request_hedging=hedging, script=[(0.05, "slow")])
+    assert _request(client, "forecast") == "slow"
+    assert hedging.requests == 0
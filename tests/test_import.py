@@ -0,0 +1,57 @@
+"""Import time budget of the package."""
+import json
+import subprocess
+import sys
+
+import pyweatherflowrest
+
+# Generous limit on the cumulative import time of the package, in
+# microseconds. The package itself takes about 1 ms, aiohttp alone far more.
+IMPORT_BUDGET_US = 50_000
+
+
+def _modules_after(statement: str) -> list:
+    """Return the modules loaded by a fresh interpreter after running statement."""
+    code = f"import sys\n{statement}\nimport json\nprint(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, check=True, text=True)
+    return json.loads(result.stdout)
+
+
+def test_import_does_not_load_aiohttp():
+    """Importing the package only loads the exceptions module."""
+    modules = _modules_after("import pyweatherflowrest")
+    assert "aiohttp" not in modules
+    assert [name for name in modules if name.startswith("pyweatherflowrest")] == [
+        "pyweatherflowrest",
+        "pyweatherflowrest.exceptions",
+    ]
+
+
+def test_import_time_within_budget():
+    """Importing the package stays within the import time budget."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pyweatherflowrest"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    # Lines read "import time: self [us] | cumulative | imported package".
+    cumulative = {
+        parts[2].strip(): int(parts[1])
+        for parts in (line.split("|") for line in result.stderr.splitlines())
+        if len(parts) == 3 and parts[1].strip().isdigit()
+    }
+    assert cumulative["pyweatherflowrest"] < IMPORT_BUDGET_US
+
+
+def test_data_import_does_not_load_aiohttp():
+    """The dataclasses and calculations can be used without aiohttp."""
+    modules = _modules_after("import pyweatherflowrest.data, pyweatherflowrest.helpers")
+    assert "aiohttp" not in modules
+
+
+def test_lazy_attributes():
+    """The client and every submodule resolve on first access."""
+    for name in pyweatherflowrest._LAZY_SUBMODULES:  # pylint: disable=protected-access
+        assert getattr(pyweatherflowrest, name).__name__ == f"pyweatherflowrest.{name}"
+    assert pyweatherflowrest.WeatherFlowApiClient.__name__ == "WeatherFlowApiClient"
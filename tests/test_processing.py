@@ -0,0 +1,194 @@
+"""Behavior of observation and forecast processing."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import pytest
+
+from pyweatherflowrest import snapshot
+from pyweatherflowrest.exceptions import BadRequest, Invalid
+from pyweatherflowrest.forecast import resample_hourly
+from pyweatherflowrest.history import RollingWindow
+from pyweatherflowrest.quality import (
+    ISSUE_DUPLICATE,
+    ISSUE_OUT_OF_RANGE,
+    ISSUE_RATE_OF_CHANGE,
+    ObservationFilter,
+)
+from pyweatherflowrest.store import CircularMean
+
+from tests.stub import NOW, StubClient, observation, settle
+
+
+async def _updated_client(**kwargs) -> StubClient:
+    """Return an initialized client with observations and forecast."""
+    client = StubClient(1, "token", **kwargs)
+    await client.initialize()
+    await client.update_observations()
+    await client.update_forecast()
+    return client
+
+
+def test_snapshot_round_trip():
+    """Station, observation and forecast data are restored unchanged."""
+
+    async def run():
+        client = await _updated_client(forecast_hours=240)
+        for entity_data in (client._station_data, client._observation_data, client._forecast_data):
+            assert snapshot.loads(snapshot.dumps(entity_data)) == entity_data
+
+    asyncio.run(run())
+
+
+def test_snapshot_rejects_other_data():
+    """Data that is not a snapshot of this format is rejected."""
+    with pytest.raises(TypeError):
+        snapshot.dumps({"air_temperature": 12})
+    with pytest.raises(Invalid):
+        snapshot.loads(b"not a snapshot at all")
+
+
+def test_executor_forecast_matches_event_loop_forecast():
+    """A forecast built in an executor equals one built on the event loop."""
+
+    async def run():
+        client = await _updated_client(forecast_hours=240)
+        with ThreadPoolExecutor(1) as executor:
+            pooled = await _updated_client(forecast_hours=240, executor=executor)
+        assert pooled._forecast_data == client._forecast_data
+
+    asyncio.run(run())
+
+
+def test_observation_filter_removes_bad_values():
+    """Out of range values and jumps are removed and duplicates are repeated."""
+    observation_filter = ObservationFilter()
+    first = observation_filter(observation(NOW, air_temperature=12.0, relative_humidity=120))
+    assert first["air_temperature"] == 12.0
+    assert first["relative_humidity"] is None
+    assert observation_filter.issues == {"relative_humidity": ISSUE_OUT_OF_RANGE}
+
+    jump = observation_filter(observation(NOW + 60, air_temperature=30.0))
+    assert jump["air_temperature"] is None
+    assert observation_filter.issues["air_temperature"] == ISSUE_RATE_OF_CHANGE
+
+    repeated = observation_filter(observation(NOW + 60, air_temperature=5.0))
+    assert observation_filter.is_duplicate
+    assert observation_filter.issues == {"timestamp": ISSUE_DUPLICATE}
+    assert repeated == jump
+
+
+def test_observation_filter_carries_values_forward():
+    """With carry_forward, removed values are replaced by the last accepted one while recent."""
+    observation_filter = ObservationFilter(carry_forward=True, max_carry_seconds=120)
+    observation_filter(observation(NOW, wind_avg=3.0))
+    assert observation_filter(observation(NOW + 60, wind_avg=-1))["wind_avg"] == 3.0
+    assert observation_filter(observation(NOW + 300, wind_avg=-1))["wind_avg"] is None
+
+
+def test_rolling_window_aggregates():
+    """Aggregates follow samples as they are added, replaced and expired."""
+    window = RollingWindow(max_samples=3, retention=100)
+    for timestamp, value in ((0, 5.0), (10, 1.0), (20, 3.0)):
+        window.append(timestamp, value)
+    assert (window.minimum, window.maximum, window.total, window.mean) == (1.0, 5.0, 9.0, 3.0)
+
+    window.append(20, 100.0)
+    assert len(window) == 3
+    assert window.latest == 3.0
+
+    window.append(30, 2.0)
+    assert (window.first, window.minimum, window.maximum, window.change) == (1.0, 1.0, 3.0, 1.0)
+
+    window.expire(125)
+    assert len(window) == 1
+    assert window.latest == 2.0
+    window.expire(500)
+    assert len(window) == 0
+    assert window.mean is None
+
+
+def test_resample_hourly():
+    """Hourly items are interpolated, precipitation is shared out and directions wrap."""
+
+    async def run():
+        client = await _updated_client(forecast_hours=3)
+        return client._forecast_data
+
+    forecast = asyncio.run(run())
+    hourly = forecast.forecast_hourly
+    resampled = resample_hourly(hourly, 30)
+    assert len(resampled) == 2 * (len(hourly) - 1) + 1
+    assert resampled[0].utc_time == hourly[0].utc_time
+    assert resampled[2].utc_time == hourly[1].utc_time
+    halfway = (hourly[0].air_temperature + hourly[1].air_temperature) / 2
+    assert resampled[1].air_temperature == pytest.approx(halfway)
+    assert resampled[1].precip == pytest.approx(hourly[0].precip / 2)
+    # Halfway between 10 and 350 degrees is north, not south.
+    assert resampled[1].wind_direction == 0
+    assert resampled[1].wind_direction_cardinal == "N"
+    assert forecast.resample(30) is forecast.resample(30)
+
+    with pytest.raises(ValueError):
+        resample_hourly(hourly, 0)
+
+
+def test_circular_mean():
+    """Angles on both sides of north average to north, opposite angles to None."""
+    mean = CircularMean()
+    for value in (359.99, 0.01):
+        mean.step(value)
+    assert mean.finalize() == 0.0
+
+    mean = CircularMean()
+    for value in (90, 270):
+        mean.step(value)
+    assert mean.finalize() is None
+
+
+def test_stale_while_revalidate_marks_stale_data():
+    """Served data is stale when it is old or the background refresh failed."""
+
+    async def run():
+        client = await _updated_client(stale_while_revalidate=3600)
+        served = await client.update_observations()
+        assert served.is_stale is False
+        await settle()
+        assert client.calls["observations"] == 2
+
+        client._fetched_at["observations"] = time.monotonic() - 300
+        client.responses["observations"] = BadRequest("offline")
+        served = await client.update_observations()
+        assert served.is_stale is True
+        assert served.data_age >= 300
+        await settle()
+
+        # The failed refresh keeps the data stale, even though it is recent.
+        client._fetched_at["observations"] = time.monotonic()
+        served = await client.update_observations()
+        assert served.is_stale is True
+        assert client._observation_data.is_stale is None
+        await settle()
+
+        client.responses["observations"] = {"status": {"status_code": 0}, "obs": [observation()]}
+        await client.update_observations()
+        await settle()
+        served = await client.update_observations()
+        assert served.is_stale is False
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_stale_data_is_not_served_after_limit():
+    """Data older than stale_while_revalidate is fetched before it is returned."""
+
+    async def run():
+        client = await _updated_client(stale_while_revalidate=60)
+        client._fetched_at["forecast"] = time.monotonic() - 120
+        served = await client.update_forecast()
+        assert client.calls["forecast"] == 2
+        assert served.is_stale is False
+        assert served.data_age == 0.0
+
+    asyncio.run(run())